@@ -0,0 +1,49 @@
+"""Shared helpers for the AtlasIED AZM benchmarks."""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TOOLS = os.path.join(ROOT, "tools")
+
+for path in (TOOLS, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import azm_package  # noqa: E402
+
+# The coordinator and the platforms are imported from custom_components
+azm_package.install()
+
+
+def has_homeassistant() -> bool:
+    """Return True if Home Assistant can be imported."""
+    try:
+        import homeassistant  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Return the best wall time of several calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def result(name: str, value: float, unit: str, **context: Any) -> dict[str, Any]:
+    """Build one machine-readable benchmark result."""
+    return {"name": name, "value": value, "unit": unit, **context}
+
+
+def print_results(results: list[dict[str, Any]]) -> None:
+    """Print results as an aligned table."""
+    for item in results:
+        print(f"{item['name']:48s} {item['value']:14.1f} {item['unit']}")
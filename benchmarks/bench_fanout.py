@@ -0,0 +1,70 @@
+"""Benchmark for coordinator update fan-out.
+
+Measures the cost of AZMCoordinator._handle_update plus the listener flush
+for one parameter watched by N listeners. Requires Home Assistant.
+
+Usage: python benchmarks/bench_fanout.py [--updates N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from typing import Any
+
+import _common
+
+
+def run(updates: int = 20000, repeat: int = 3) -> list[dict[str, Any]]:
+    """Run the fan-out benchmark and return its results."""
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.atlasied_azm import AZMCoordinator
+
+    async def measure(listeners: int) -> float:
+        hass = HomeAssistant(tempfile.mkdtemp())
+        coordinator = AZMCoordinator(hass, "bench", 16, 16, 8)
+        calls = 0
+
+        def listener():
+            nonlocal calls
+            calls += 1
+
+        for _ in range(listeners):
+            # Distinct callables, as distinct entities would register
+            coordinator.subscribe_parameter("ZoneGain_0", lambda: listener())
+
+        def feed():
+            for i in range(updates):
+                coordinator._handle_update({"param": "ZoneGain_0", "pct": i % 101})
+                coordinator._flush_dirty()
+
+        best = float("inf")
+        for _ in range(repeat):
+            start = hass.loop.time()
+            feed()
+            best = min(best, hass.loop.time() - start)
+        assert calls
+        return best
+
+    results = []
+    for listeners in (1, 4, 16, 64):
+        elapsed = asyncio.run(measure(listeners))
+        results.append(_common.result(
+            f"fanout.{listeners}_listeners", elapsed / updates * 1e6, "us/update",
+            listeners=listeners,
+        ))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    _common.print_results(run(args.updates, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Micro-benchmark for TCP line framing of large getResp bursts.
+
+Compares the incremental LineFramer against the previous str-split loop
+on a synthetic burst delivered in fixed-size reads.
+
+Usage: python benchmarks/bench_framer.py [--messages N] [--params N] [--chunk BYTES]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any
+
+import _common
+from atlasied_azm.azm_client import LineFramer
+
+
+def build_burst(messages: int, params_per_message: int) -> bytes:
+    """Build a burst of newline-delimited getResp messages."""
+    lines = []
+    for i in range(messages):
+        params = [
+            {"param": f"ZoneGain_{z}", "pct": (i + z) % 101}
+            for z in range(params_per_message - 1)
+        ]
+        params.append({"param": f"ZoneName_{i % 16}", "str": "Salle à manger ☕"})
+        lines.append(json.dumps({"jsonrpc": "2.0", "method": "getResp", "params": params}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def split_chunks(data: bytes, chunk: int) -> list[bytes]:
+    """Split data the way successive socket reads would."""
+    return [data[i:i + chunk] for i in range(0, len(data), chunk)]
+
+
+def frame_legacy(chunks: list[bytes]) -> int:
+    """Frame with the previous decode-and-split loop."""
+    count = 0
+    buffer = ""
+    for data in chunks:
+        buffer += data.decode("utf-8", "replace")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if line:
+                count += 1
+    return count
+
+
+def frame_incremental(chunks: list[bytes]) -> int:
+    """Frame with LineFramer."""
+    count = 0
+    framer = LineFramer()
+    for data in chunks:
+        count += len(framer.feed(data))
+    return count
+
+
+def run(
+    messages: int = 20000,
+    params: int = 1,
+    chunk: int = 1024 * 1024,
+    repeat: int = 5,
+    legacy: bool = False,
+) -> list[dict[str, Any]]:
+    """Run the framing benchmark and return its results."""
+    data = build_burst(messages, params)
+    chunks = split_chunks(data, chunk)
+    assert frame_incremental(chunks) == messages
+
+    framers = [("incremental", frame_incremental)]
+    if legacy:
+        framers.append(("legacy", frame_legacy))
+
+    results = []
+    for name, func in framers:
+        elapsed = _common.best_of(lambda: func(chunks), repeat)
+        results.append(_common.result(
+            f"framing.{name}", messages / elapsed, "msg/s",
+            messages=messages, bytes=len(data), chunk=chunk,
+        ))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--params", type=int, default=1, help="params per message")
+    parser.add_argument("--chunk", type=int, default=1024 * 1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    _common.print_results(
+        run(args.messages, args.params, args.chunk, args.repeat, legacy=True)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark for inbound message handling in AZMClient.
+
+Measures how many TCP and UDP messages per second _handle_tcp_message and
+_handle_udp_message can parse, queue and, once per loop iteration, dispatch
+to the coordinator callbacks.
+
+Usage: python benchmarks/bench_ingest.py [--messages N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import Any
+
+import _common
+from atlasied_azm.azm_client import AZMClient
+
+
+def tcp_messages(count: int, params_per_message: int) -> list[str]:
+    """Build update messages carrying params_per_message gains each."""
+    messages = []
+    for i in range(count):
+        params = [
+            {"param": f"ZoneGain_{z}", "pct": (i + z) % 101}
+            for z in range(params_per_message)
+        ]
+        messages.append(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "update",
+            "params": params if params_per_message > 1 else params[0],
+        }))
+    return messages
+
+
+def udp_messages(count: int, meters: int) -> list[str]:
+    """Build meter datagrams carrying one value per meter."""
+    return [
+        json.dumps({
+            "jsonrpc": "2.0",
+            "method": "update",
+            "params": [
+                {"param": f"ZoneMeter_{m}", "val": -float((i + m) % 60)}
+                for m in range(meters)
+            ],
+        })
+        for i in range(count)
+    ]
+
+
+# Messages handled between loop iterations, roughly one socket read's worth
+TICK_MESSAGES = 64
+
+
+def run(messages: int = 20000, repeat: int = 3) -> list[dict[str, Any]]:
+    """Run the ingest benchmarks and return their results."""
+    received = 0
+
+    def on_update(param_data):
+        nonlocal received
+        received += 1
+
+    def on_meter(param_data):
+        nonlocal received
+        received += 1
+
+    client = AZMClient("bench", on_update, on_meter)
+    results = []
+    loop = asyncio.new_event_loop()
+
+    def measure(handle, batch) -> float:
+        async def feed():
+            for start in range(0, len(batch), TICK_MESSAGES):
+                for message in batch[start:start + TICK_MESSAGES]:
+                    handle(message)
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        return _common.best_of(lambda: loop.run_until_complete(feed()), repeat)
+
+    try:
+        for params in (1, 16):
+            elapsed = measure(client._handle_tcp_message, tcp_messages(messages, params))
+            results.append(_common.result(
+                f"ingest.tcp.{params}_params", messages / elapsed, "msg/s",
+                params_per_message=params,
+            ))
+
+        elapsed = measure(client._handle_udp_message, udp_messages(messages, 16))
+        results.append(_common.result(
+            "ingest.udp.16_meters", messages / elapsed, "msg/s", params_per_message=16
+        ))
+    finally:
+        loop.close()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    _common.print_results(run(args.messages, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
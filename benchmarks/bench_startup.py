@@ -0,0 +1,130 @@
+"""Benchmark for end-to-end entity setup against a simulated device.
+
+Connects a coordinator to tools/azm_simulator.py, sets up the number,
+switch and sensor platforms for a 16-zone/16-source/8-group device and
+measures the time until every entity's parameters hold a value from the
+device. Requires Home Assistant.
+
+Usage: python benchmarks/bench_startup.py [--latency SECONDS]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any
+
+import _common
+
+ZONES = 16
+SOURCES = 16
+GROUPS = 8
+
+
+async def measure(latency: float) -> tuple[float, int, int]:
+    """Return setup time, entity count and messages the device received."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import CONF_HOST
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers import entity as entity_helper
+    from homeassistant.helpers import entity_registry as er
+    from homeassistant.helpers.entity_platform import EntityPlatform
+
+    from azm_simulator import AZMSimulator
+    from custom_components.atlasied_azm import AZMCoordinator, azm_client, number, sensor, switch
+    from custom_components.atlasied_azm.const import (
+        CONF_NUM_GROUPS,
+        CONF_NUM_SOURCES,
+        CONF_NUM_ZONES,
+        DOMAIN,
+    )
+
+    azm_client.UDP_PORT = 0
+    simulator = AZMSimulator("127.0.0.1", 0, ZONES, SOURCES, GROUPS, latency, meter_rate=0)
+    await simulator.start()
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    entity_helper.async_setup(hass)
+    await er.async_load(hass)
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="bench",
+        data={
+            CONF_HOST: "127.0.0.1",
+            CONF_NUM_ZONES: ZONES,
+            CONF_NUM_SOURCES: SOURCES,
+            CONF_NUM_GROUPS: GROUPS,
+        },
+        source="user",
+    )
+
+    start = time.perf_counter()
+
+    coordinator = AZMCoordinator(hass, "127.0.0.1", ZONES, SOURCES, GROUPS)
+    coordinator.client.port = simulator.port
+    assert await coordinator.async_connect()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+
+    entities = []
+    for module, domain in ((number, "number"), (switch, "switch"), (sensor, "sensor")):
+        platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(__name__),
+            domain=domain,
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        added: list[Any] = []
+        await module.async_setup_entry(hass, entry, added.extend)
+        await platform.async_add_entities(added)
+        entities += added
+    await coordinator.async_flush_registrations()
+
+    # Meters are only pushed over UDP, so wait for everything else
+    params = [
+        param
+        for entity in entities
+        for param in (getattr(entity, "_param", None), getattr(entity, "_name_param", None))
+        if param and "Meter" not in param
+    ]
+    while any(coordinator.get_value(param) is None for param in params):
+        await asyncio.sleep(0.001)
+
+    elapsed = time.perf_counter() - start
+    messages = simulator.messages_in
+
+    await coordinator.async_disconnect()
+    await simulator.stop()
+    await hass.async_stop(force=True)
+    return elapsed, len(entities), messages
+
+
+def run(latency: float = 0.0, repeat: int = 3) -> list[dict[str, Any]]:
+    """Run the startup benchmark and return its results."""
+    runs = [asyncio.run(measure(latency)) for _ in range(repeat)]
+    elapsed, entities, messages = min(runs)
+    context = {"zones": ZONES, "sources": SOURCES, "groups": GROUPS, "latency": latency}
+    return [
+        _common.result("startup.entity_setup", elapsed * 1000, "ms", entities=entities, **context),
+        _common.result("startup.device_messages", messages, "messages", **context),
+    ]
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    _common.print_results(run(args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Run the AtlasIED AZM benchmark suite.
+
+Runs every benchmark, prints a table and optionally writes the results as
+JSON. Given a baseline file from an earlier run, exits non-zero if any
+result regressed by more than the tolerance. Benchmarks that need Home
+Assistant are skipped when it is not installed. Captures recorded with the
+start_capture service can be added as replay benchmarks with --capture.
+
+Usage: python benchmarks/run.py [--output results.json] [--baseline old.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any
+
+import _common
+import azm_replay
+import bench_fanout
+import bench_framer
+import bench_ingest
+import bench_startup
+
+
+def higher_is_better(unit: str) -> bool:
+    """Return True for throughput units such as msg/s."""
+    return unit.endswith("/s")
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """Return a description of every result worse than the baseline."""
+    previous = {item["name"]: item for item in baseline}
+    regressions = []
+    for item in results:
+        old = previous.get(item["name"])
+        if old is None or not old["value"]:
+            continue
+        change = (item["value"] - old["value"]) / old["value"]
+        if higher_is_better(item["unit"]):
+            change = -change
+        if change > tolerance:
+            regressions.append(
+                f"{item['name']}: {old['value']:.1f} -> {item['value']:.1f} {item['unit']} "
+                f"({change:+.0%} worse)"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Run the suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results from this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing (default 0.2)")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--capture", action="append", default=[],
+                        help="also replay this capture file (repeatable)")
+    args = parser.parse_args()
+
+    scale = 5 if args.quick else 1
+    results = []
+    results += bench_framer.run(messages=20000 // scale)
+    results += bench_ingest.run(messages=20000 // scale)
+    if _common.has_homeassistant():
+        results += bench_fanout.run(updates=20000 // scale)
+        results += bench_startup.run()
+    else:
+        print("Home Assistant not installed; skipping fan-out and startup benchmarks")
+    for path in args.capture:
+        results += azm_replay.run(path)
+
+    _common.print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,51 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.storage import Store
 
 from .azm_client import AZMClient
-from .const import DOMAIN
+from .capture import CaptureWriter
+from .const import (
+    CONF_FADE_STEP_RATE,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSES,
+    CONF_METER_MAX_RATE,
+    CONF_METER_ON_DEMAND,
+    CONF_SEND_BURST,
+    CONF_SEND_RATE,
+    CONF_METER_WINDOW,
+    CONF_NUM_GROUPS,
+    CONF_NUM_SOURCES,
+    CONF_NUM_ZONES,
+    CONF_STATE_FLUSH_INTERVAL,
+    DEFAULT_FADE_STEP_RATE,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSES,
+    DEFAULT_METER_MAX_RATE,
+    DEFAULT_METER_ON_DEMAND,
+    DEFAULT_SEND_BURST,
+    DEFAULT_SEND_RATE,
+    DEFAULT_METER_WINDOW,
+    DEFAULT_NUM_GROUPS,
+    DEFAULT_NUM_SOURCES,
+    DEFAULT_NUM_ZONES,
+    DEFAULT_STATE_FLUSH_INTERVAL,
+    DOMAIN,
+    STATE_SAVE_DELAY,
+)
+from .meter import MeterAggregator, MeterReading
+from .fade import FadeEngine
+from .params import METER_FAMILIES, TEXT_FAMILIES, ParameterStore, parse_param
+from .scenes import SceneManager, async_remove_scenes
+from .services import async_setup_services, async_unload_services
+from .stats import CoordinatorStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,43 +57,166 @@ PLATFORMS: list[Platform] = [
     Platform.SENSOR,
 ]
 
+STATE_STORAGE_VERSION = 1
+
+
+def _state_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding a config entry's warm-start state cache."""
+    return Store(hass, STATE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.state")
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up AtlasIED AZM from a config entry."""
     host = entry.data[CONF_HOST]
 
-    coordinator = AZMCoordinator(hass, host)
+    coordinator = AZMCoordinator(
+        hass,
+        host,
+        num_zones=entry.data.get(CONF_NUM_ZONES, DEFAULT_NUM_ZONES),
+        num_sources=entry.data.get(CONF_NUM_SOURCES, DEFAULT_NUM_SOURCES),
+        num_groups=entry.data.get(CONF_NUM_GROUPS, DEFAULT_NUM_GROUPS),
+        meter_window=entry.options.get(CONF_METER_WINDOW, DEFAULT_METER_WINDOW),
+        meter_max_rate=entry.options.get(CONF_METER_MAX_RATE, DEFAULT_METER_MAX_RATE),
+        state_flush_interval=entry.options.get(
+            CONF_STATE_FLUSH_INTERVAL, DEFAULT_STATE_FLUSH_INTERVAL
+        ),
+        heartbeat_interval=entry.options.get(
+            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+        ),
+        heartbeat_misses=entry.options.get(CONF_HEARTBEAT_MISSES, DEFAULT_HEARTBEAT_MISSES),
+        meter_on_demand=entry.options.get(CONF_METER_ON_DEMAND, DEFAULT_METER_ON_DEMAND),
+        send_rate=entry.options.get(CONF_SEND_RATE, DEFAULT_SEND_RATE),
+        send_burst=entry.options.get(CONF_SEND_BURST, DEFAULT_SEND_BURST),
+        fade_step_rate=entry.options.get(CONF_FADE_STEP_RATE, DEFAULT_FADE_STEP_RATE),
+        state_store=_state_store(hass, entry.entry_id),
+    )
+
+    # Entities start from the last known values while the device resyncs
+    await coordinator.async_load_state()
     
     if not await coordinator.async_connect():
         raise ConfigEntryNotReady(f"Unable to connect to AZM device at {host}")
 
+    coordinator.scenes = SceneManager(hass, coordinator, entry.entry_id)
+    await coordinator.scenes.async_load()
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    await async_setup_services(hass)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Entities only queue their parameters while the platforms are being set
+    # up; send them to the device now as a handful of batched messages.
+    await coordinator.async_flush_registrations()
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the integration when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator: AZMCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
         await coordinator.async_disconnect()
+        async_unload_services(hass)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete stored data when a config entry is removed."""
+    await async_remove_scenes(hass, entry.entry_id)
+    await _state_store(hass, entry.entry_id).async_remove()
+
+
+class _PendingSet:
+    """Latest value waiting to be sent for a parameter."""
+
+    __slots__ = ("value", "fmt", "future")
+
+    def __init__(self, value: Any, fmt: str, future: asyncio.Future):
+        """Initialize the pending set."""
+        self.value = value
+        self.fmt = fmt
+        self.future = future
+
+
 class AZMCoordinator:
     """Coordinator to manage AZM device connection and state."""
 
-    def __init__(self, hass: HomeAssistant, host: str):
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        num_zones: int = DEFAULT_NUM_ZONES,
+        num_sources: int = DEFAULT_NUM_SOURCES,
+        num_groups: int = DEFAULT_NUM_GROUPS,
+        meter_window: float = DEFAULT_METER_WINDOW,
+        meter_max_rate: float = DEFAULT_METER_MAX_RATE,
+        state_flush_interval: float = DEFAULT_STATE_FLUSH_INTERVAL,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        heartbeat_misses: int = DEFAULT_HEARTBEAT_MISSES,
+        meter_on_demand: bool = DEFAULT_METER_ON_DEMAND,
+        send_rate: float = DEFAULT_SEND_RATE,
+        send_burst: int = DEFAULT_SEND_BURST,
+        fade_step_rate: float = DEFAULT_FADE_STEP_RATE,
+        state_store: Store[dict[str, Any]] | None = None,
+    ):
+        """Initialize the coordinator.
+
+        With meter_on_demand, meter entities do not keep their meters
+        subscribed; the device only streams meters requested through
+        request_meters. With a state_store, known parameter values are cached
+        across restarts; see async_load_state. send_rate and send_burst
+        limit the messages sent to the device; see AZMClient. Gain fades
+        advance fade_step_rate times per second; see FadeEngine.
+        """
         self.hass = hass
         self.host = host
-        self.client = AZMClient(host, self._handle_update)
-        self._data: dict[str, Any] = {}
+        self.num_zones = num_zones
+        self.num_sources = num_sources
+        self.num_groups = num_groups
+        self.meter_on_demand = meter_on_demand
+        self.client = AZMClient(
+            host,
+            self._handle_update,
+            self._handle_meter,
+            self._handle_connection_change,
+            heartbeat_interval=heartbeat_interval,
+            heartbeat_misses=heartbeat_misses,
+            send_rate=send_rate,
+            send_burst=send_burst,
+        )
+        self._meters = MeterAggregator(
+            hass.loop, self._publish_meter, meter_window, meter_max_rate
+        )
+        self._store = ParameterStore(num_zones, num_sources, num_groups)
+        self._meter_readings: dict[str, MeterReading] = {}
         self._listeners: dict[str, list] = {}
+        self._param_refs: dict[str, int] = {}
+        self._pending_params: dict[str, str] = {}
+        self._pending_unsubscribe: dict[str, str] = {}
+        self._defer_registrations = True
+        self._flush_scheduled = False
+        self._pending_sets: dict[str, _PendingSet] = {}
+        self._sets_in_flight: set[str] = set()
+        self._state_flush_interval = state_flush_interval
+        self._dirty: dict[Callable[[], None], None] = {}
+        self._state_flush_handle: asyncio.Handle | None = None
+        self.stats = CoordinatorStats()
+        self.scenes: SceneManager | None = None
+        self.fades = FadeEngine(self, fade_step_rate)
+        self._state_store = state_store
+        self._state_save_scheduled = False
+        self._cached_params: set[str] = set()
+        self._meter_leases: dict[str, asyncio.TimerHandle] = {}
 
     async def async_connect(self) -> bool:
         """Connect to the AZM device."""
@@ -65,9 +224,85 @@ class AZMCoordinator:
 
     async def async_disconnect(self):
         """Disconnect from the AZM device."""
+        # The device drops our subscriptions with the connection; there is
+        # nothing left worth sending.
+        await self.fades.async_stop()
+        self._pending_params.clear()
+        self._pending_unsubscribe.clear()
+        for pending in self._pending_sets.values():
+            pending.future.set_result(False)
+        self._pending_sets.clear()
+        for handle in self._meter_leases.values():
+            handle.cancel()
+        self._meter_leases.clear()
+        self._meters.close()
+        if self._state_flush_handle is not None:
+            self._state_flush_handle.cancel()
+            self._state_flush_handle = None
+        self._dirty.clear()
+        if self._state_save_scheduled:
+            await self._state_store.async_save(self._state_data())
+        await self.async_stop_capture()
         await self.client.disconnect()
 
-    async def _handle_update(self, param_data: dict[str, Any]):
+    async def async_start_capture(self, path: str) -> None:
+        """Start recording all device traffic to a capture file.
+
+        A capture already running is stopped first.
+        """
+        await self.async_stop_capture()
+        capture = CaptureWriter(self.hass.loop, path)
+        await capture.async_open()
+        self.client.capture = capture
+        _LOGGER.info("Capturing traffic of %s to %s", self.host, path)
+
+    async def async_stop_capture(self) -> None:
+        """Stop recording device traffic, if a capture is running."""
+        capture = self.client.capture
+        if capture is None:
+            return
+        self.client.capture = None
+        await capture.async_close()
+
+    async def async_load_state(self) -> int:
+        """Load the cached parameter values saved by a previous run.
+
+        Returns the number of values loaded. Cached names are trusted and not
+        read back from the device on startup; everything else is re-read when
+        its entity registers.
+        """
+        if self._state_store is None:
+            return 0
+        data = await self._state_store.async_load()
+        if not data:
+            return 0
+        values = data.get("values", {})
+        for param, value in values.items():
+            self._store.set(param, value)
+        self._cached_params = {
+            param for param in values
+            if (key := parse_param(param)) is not None and key.family in TEXT_FAMILIES
+        }
+        _LOGGER.debug("Loaded %d cached values for %s", len(values), self.host)
+        return len(values)
+
+    def _schedule_state_save(self) -> None:
+        """Write the state cache after STATE_SAVE_DELAY unless already queued.
+
+        Store.async_delay_save restarts its timer on every call, which would
+        postpone the write forever while values keep changing, so it is only
+        called once per dirty period.
+        """
+        if self._state_store is not None and not self._state_save_scheduled:
+            self._state_save_scheduled = True
+            self._state_store.async_delay_save(self._state_data, STATE_SAVE_DELAY)
+
+    def _state_data(self) -> dict[str, Any]:
+        """Return the state cache contents."""
+        self._state_save_scheduled = False
+        return {"values": self._store.dump(skip=METER_FAMILIES)}
+
+    def _handle_update(self, param_data: dict[str, Any]) -> None:
         """Handle parameter updates from the device."""
         param = param_data.get("param")
         if not param:
@@ -76,13 +311,92 @@ class AZMCoordinator:
         # Store the value
         for key in ("val", "pct", "str"):
             if key in param_data:
-                self._data[param] = param_data[key]
+                value = param_data[key]
                 break
+        else:
+            return
+
+        # The device re-sends unchanged values (getResp, resubscribes);
+        # only real changes need to reach the state machine.
+        self.stats.updates += 1
+        if self._store.set(param, value):
+            self._notify_listeners(param)
+            self._schedule_state_save()
+        else:
+            self.stats.unchanged_updates += 1
+
+    def _handle_meter(self, param_data: dict[str, Any]) -> None:
+        """Feed a meter update from the device into the aggregator."""
+        param = param_data.get("param")
+        if not param:
+            return
+
+        try:
+            value = float(param_data["val"])
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.debug("Ignoring meter update without a numeric value: %s", param_data)
+            return
+
+        self.stats.meter_samples += 1
+        self._meters.add_sample(param, value)
+
+    def _publish_meter(self, param: str, reading: MeterReading) -> None:
+        """Store an aggregated meter reading and notify its entities."""
+        if self._meter_readings.get(param) == reading:
+            return
+        self._store.set(param, reading.last)
+        self._meter_readings[param] = reading
+        self._notify_listeners(param)
+
+    def _handle_connection_change(self, connected: bool) -> None:
+        """Refresh every entity's availability when the link goes up or down."""
+        if connected:
+            _LOGGER.info("Connection to AZM device at %s restored", self.host)
+        else:
+            _LOGGER.warning("Lost connection to AZM device at %s, reconnecting", self.host)
+        for callbacks in self._listeners.values():
+            self._dirty.update(dict.fromkeys(callbacks))
+        self._schedule_state_flush()
 
-        # Notify listeners
+    @property
+    def connected(self) -> bool:
+        """Return True if the device link is up."""
+        return self.client.connected
+
+    def _notify_listeners(self, param: str) -> None:
+        """Mark every listener registered for a parameter as dirty.
+
+        Dirty listeners are called once per flush, however many of their
+        parameters changed in the meantime.
+        """
         if param in self._listeners:
-            for callback in self._listeners[param]:
+            self._dirty.update(dict.fromkeys(self._listeners[param]))
+            self._schedule_state_flush()
+
+    def _schedule_state_flush(self) -> None:
+        """Schedule a flush of dirty listeners if one is not pending."""
+        if self._state_flush_handle is not None:
+            return
+        if self._state_flush_interval > 0:
+            self._state_flush_handle = self.hass.loop.call_later(
+                self._state_flush_interval, self._flush_dirty
+            )
+        else:
+            self._state_flush_handle = self.hass.loop.call_soon(self._flush_dirty)
+
+    def _flush_dirty(self) -> None:
+        """Call each dirty listener once."""
+        self._state_flush_handle = None
+        dirty = self._dirty
+        self._dirty = {}
+        started = time.perf_counter()
+        for callback in dirty:
+            try:
                 callback()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error updating entity state for %s", self.host)
+        self.stats.listener_calls += len(dirty)
+        self.stats.dispatch_time.record(time.perf_counter() - started)
 
     def subscribe_parameter(self, param: str, callback):
         """Subscribe to parameter updates."""
@@ -102,11 +416,189 @@ class AZMCoordinator:
 
     def get_value(self, param: str) -> Any:
         """Get the current value of a parameter."""
-        return self._data.get(param)
+        return self._store.get(param)
+
+    def get_family(self, family: str) -> list[Any]:
+        """Get the current values of a parameter family, indexed by channel."""
+        return self._store.snapshot(family)
+
+    def get_meter_reading(self, param: str) -> MeterReading | None:
+        """Get the aggregated reading of a meter parameter."""
+        return self._meter_readings.get(param)
 
     async def set_parameter(self, param: str, value: Any, fmt: str = "val") -> bool:
-        """Set a parameter value."""
-        return await self.client.send_set(param, value, fmt)
+        """Set a parameter value.
+
+        Sets are coalesced per parameter: while a set for the parameter is
+        queued or in flight, newer values replace the queued one, so only the
+        latest value is sent once the previous set has gone out. Callers whose
+        value was superseded share the result of the set that replaced it.
+        A fade running on the parameter is stopped.
+        """
+        self.fades.cancel((param,))
+        pending = self._pending_sets.get(param)
+        if pending is not None:
+            pending.value = value
+            pending.fmt = fmt
+            return await asyncio.shield(pending.future)
+
+        pending = self._pending_sets[param] = _PendingSet(
+            value, fmt, self.hass.loop.create_future()
+        )
+        if param not in self._sets_in_flight:
+            self.hass.async_create_task(self._async_send_sets(param))
+        return await asyncio.shield(pending.future)
+
+    async def _async_send_sets(self, param: str) -> None:
+        """Send the latest pending set for a parameter until none is left."""
+        self._sets_in_flight.add(param)
+        pending = None
+        try:
+            while (pending := self._pending_sets.pop(param, None)) is not None:
+                result = await self.client.send_set(param, pending.value, pending.fmt)
+                pending.future.set_result(result)
+        finally:
+            self._sets_in_flight.discard(param)
+            if pending is not None and not pending.future.done():
+                pending.future.set_result(False)
+
+    async def async_set_parameters(
+        self, values: list[tuple[str, Any, str]], cancel_fades: bool = True
+    ) -> bool:
+        """Set several parameters with as few messages as possible.
+
+        values holds (param, value, fmt) tuples; they are sent as batched set
+        messages rather than one message per parameter. The new values are
+        stored and published to entities right away instead of waiting for
+        the device to echo them, and put back if the sets cannot be sent.
+        They replace any coalesced set still queued
+        for the same parameters. Unless cancel_fades is False, fades running
+        on the parameters are stopped.
+        """
+        if cancel_fades:
+            self.fades.cancel(param for param, _, _ in values)
+        superseded = []
+        previous = {}
+        for param, value, _ in values:
+            pending = self._pending_sets.pop(param, None)
+            if pending is not None:
+                superseded.append(pending)
+            old = self._store.get(param)
+            if self._store.set(param, value):
+                previous[param] = (old, value)
+                self._notify_listeners(param)
+        self._schedule_state_save()
+
+        result = await self.client.set_multiple(values)
+        if not result:
+            # The device may never have changed; go back to what it last
+            # reported unless something newer arrived meanwhile.
+            for param, (old, value) in previous.items():
+                if self._store.get(param) == value and self._store.set(param, old):
+                    self._notify_listeners(param)
+            self._schedule_state_save()
+        for pending in superseded:
+            pending.future.set_result(result)
+        return result
+
+    def register_parameter(self, param: str, fmt: str = "val") -> None:
+        """Take a reference on a device parameter subscription.
+
+        Only the first reference queues a sub/get for the device.
+        Registrations made during platform setup are held until
+        async_flush_registrations is called; later ones are flushed on the
+        next event loop iteration so entities added together share a batch.
+        """
+        refs = self._param_refs.get(param, 0)
+        self._param_refs[param] = refs + 1
+        if refs:
+            return
+
+        if self._pending_unsubscribe.pop(param, None) is None:
+            self._pending_params[param] = fmt
+            self._schedule_flush()
+
+    def unregister_parameter(self, param: str, fmt: str = "val") -> None:
+        """Drop a reference on a device parameter subscription.
+
+        The device is only told to unsubscribe once the last reference is
+        released.
+        """
+        refs = self._param_refs.get(param, 0)
+        if refs > 1:
+            self._param_refs[param] = refs - 1
+            return
+        if not refs:
+            return
+
+        del self._param_refs[param]
+        key = parse_param(param)
+        if key is not None and key.family in METER_FAMILIES:
+            self._meters.remove(param)
+            self._meter_readings.pop(param, None)
+        if self._pending_params.pop(param, None) is None:
+            self._pending_unsubscribe[param] = fmt
+            self._schedule_flush()
+
+    def is_registered(self, param: str) -> bool:
+        """Return True if a device parameter is currently subscribed."""
+        return param in self._param_refs
+
+    def request_meters(self, params: list[str], duration: float) -> None:
+        """Keep meters subscribed on the device for duration seconds.
+
+        A live metering window holds one reference per meter, on top of any
+        held by entities; requesting a meter again extends its window.
+        """
+        for param in params:
+            handle = self._meter_leases.pop(param, None)
+            if handle is not None:
+                handle.cancel()
+            else:
+                self.register_parameter(param, "val")
+                self._notify_listeners(param)
+            self._meter_leases[param] = self.hass.loop.call_later(
+                duration, self._release_meter, param
+            )
+
+    def _release_meter(self, param: str) -> None:
+        """End the live metering window of a meter."""
+        del self._meter_leases[param]
+        self.unregister_parameter(param, "val")
+        self._notify_listeners(param)
+
+    def _schedule_flush(self) -> None:
+        """Flush registrations on the next loop iteration unless deferred."""
+        if not self._defer_registrations and not self._flush_scheduled:
+            self._flush_scheduled = True
+            # Tasks may start eagerly; wait for the rest of this iteration's
+            # registrations before taking the batch.
+            self.hass.loop.call_soon(self._start_flush)
+
+    def _start_flush(self) -> None:
+        """Start flushing the registrations queued so far."""
+        self.hass.async_create_task(self.async_flush_registrations())
+
+    async def async_flush_registrations(self) -> None:
+        """Send queued registrations as batched sub, get and unsub messages."""
+        self._defer_registrations = False
+        self._flush_scheduled = False
+
+        if self._pending_unsubscribe:
+            params = list(self._pending_unsubscribe.items())
+            self._pending_unsubscribe.clear()
+            _LOGGER.debug("Unsubscribing from %d parameters on %s", len(params), self.host)
+            await self.client.unsubscribe_multiple(params)
+
+        if self._pending_params:
+            params = list(self._pending_params.items())
+            self._pending_params.clear()
+            _LOGGER.debug("Subscribing to %d parameters on %s", len(params), self.host)
+            await self.client.subscribe_multiple(params)
+            # Names rarely change; a cached one is good enough until the next
+            # reconnect reads everything back.
+            stale = [(param, fmt) for param, fmt in params if param not in self._cached_params]
+            await self.client.get_multiple(stale)
 
     async def subscribe_device_parameter(self, param: str, fmt: str = "val") -> bool:
         """Subscribe to a parameter on the device."""
@@ -115,3 +607,27 @@ class AZMCoordinator:
     async def get_parameter(self, param: str, fmt: str = "val") -> bool:
         """Get a parameter value from the device."""
         return await self.client.send_get(param, fmt)
+
+    async def async_read_parameter(self, param: str, fmt: str = "val") -> Any:
+        """Read a parameter from the device and wait for its value.
+
+        Raises asyncio.TimeoutError or AZMError if the device does not answer.
+        """
+        return await self.client.get(param, fmt)
+
+    async def async_read_parameters(self, params: list[tuple[str, str]]) -> dict[str, Any]:
+        """Read several parameters concurrently.
+
+        Parameters the device did not answer in time are left out.
+        """
+        results = await asyncio.gather(
+            *(self.client.get(param, fmt) for param, fmt in params),
+            return_exceptions=True,
+        )
+        values = {}
+        for (param, _), result in zip(params, results):
+            if isinstance(result, Exception):
+                _LOGGER.debug("Reading %s failed: %s", param, result)
+            else:
+                values[param] = result
+        return values
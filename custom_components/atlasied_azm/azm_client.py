@@ -1,131 +1,492 @@
 """AtlasIED AZM4/AZM8 Client Module."""
 import asyncio
+import codecs
+import contextlib
+import itertools
 import json
 import logging
-from typing import Any, Callable, Optional
+import random
+import socket
+from collections import deque
+from typing import Any, Callable, Iterable, Optional
+
+from .capture import TCP_IN, TCP_OUT, UDP_IN, CaptureWriter
+from .stats import LinkStats
 
 _LOGGER = logging.getLogger(__name__)
 
 TCP_PORT = 5321
 UDP_PORT = 3131
 KEEPALIVE_INTERVAL = 240  # 4 minutes
+HEARTBEAT_INTERVAL = 10.0  # seconds of inbound silence before a heartbeat
+HEARTBEAT_MISSES = 3  # unanswered heartbeats before the link is declared dead
+MAX_BATCH_PARAMS = 64  # params per batched sub/get message
+READ_SIZE = 65536
+MAX_FRAME_SIZE = 1024 * 1024  # longest TCP message we are willing to buffer
+GET_TIMEOUT = 5.0  # seconds to wait for a getResp
+CONNECT_TIMEOUT = 10.0
+CLOSE_TIMEOUT = 2.0  # seconds to flush buffered writes when disconnecting
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+PROBE_TIMEOUT = 2.0  # seconds to connect to and hear back from a probed host
+DISCOVERY_CONCURRENCY = 128  # hosts probed at once during discovery
+WRITE_BATCH_BYTES = 16384  # bytes per write before bulk messages wait a round
+BULK_MIN_SHARE = 0.25  # part of every batch reserved for bulk messages
+SEND_BUFFER_BYTES = 32768  # kernel send buffer; keeps queued bulk data in our queues
+METER_BACKLOG = 4096  # meter params held between ingest drains; oldest dropped
+CONTROL_HIGH_WATER = 1024  # control params queued before TCP reads pause
+SEND_RATE = 0.0  # outbound messages per second; 0 leaves them unlimited
+SEND_BURST = 20  # messages that may go out at once after an idle period
+
+_utf8_decode = codecs.utf_8_decode
+
+# Outbound priorities, most urgent first
+PRIORITY_INTERACTIVE = 0  # set, bmp
+PRIORITY_KEEPALIVE = 1
+PRIORITY_BULK = 2  # get, sub, unsub
+
+
+class AZMError(Exception):
+    """Error raised when the device rejects or never answers a request."""
+
+
+class _PendingRequest:
+    """A get request waiting for its getResp."""
+
+    __slots__ = ("param", "future", "sent_at")
+
+    def __init__(self, param: str, future: asyncio.Future, sent_at: float):
+        """Initialize the pending request."""
+        self.param = param
+        self.future = future
+        self.sent_at = sent_at
+
+
+class _Outgoing:
+    """A queued outbound message and everyone waiting for it to be written."""
+
+    __slots__ = ("data", "futures", "queued_at", "key")
+
+    def __init__(
+        self, data: bytes, future: asyncio.Future, queued_at: float, key: Optional[tuple]
+    ):
+        """Initialize the outgoing message."""
+        self.data = data
+        self.futures = [future]
+        self.queued_at = queued_at
+        self.key = key
+
+    def resolve(self, success: bool) -> None:
+        """Tell everyone waiting whether the message was written."""
+        for future in self.futures:
+            if not future.done():
+                future.set_result(success)
+
+
+class _TokenBucket:
+    """Allows rate messages per second on average, in bursts of up to burst."""
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = now
+
+    def available(self, now: float) -> int:
+        """Return how many messages may be sent now."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return int(self._tokens)
+
+    def consume(self, count: int) -> None:
+        """Take tokens for count messages that are being sent."""
+        self._tokens -= count
+
+    def delay(self) -> float:
+        """Return the seconds until the next message may be sent."""
+        return max(0.0, (1 - self._tokens) / self.rate)
 
 
 class AZMClient:
     """Client for AtlasIED AZM4/AZM8 devices."""
 
-    def __init__(self, host: str, update_callback: Optional[Callable] = None):
-        """Initialize the AZM client."""
+    def __init__(
+        self,
+        host: str,
+        update_callback: Optional[Callable] = None,
+        meter_callback: Optional[Callable] = None,
+        connection_callback: Optional[Callable[[bool], None]] = None,
+        port: int = TCP_PORT,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_misses: int = HEARTBEAT_MISSES,
+        send_rate: float = SEND_RATE,
+        send_burst: int = SEND_BURST,
+    ):
+        """Initialize the AZM client.
+
+        Received parameters are queued and handed to the callbacks in one
+        batch per event loop iteration: TCP parameters to update_callback,
+        UDP parameters to meter_callback (or update_callback without one).
+        Both callbacks are plain functions. TCP parameters are never dropped;
+        reading from the socket pauses while too many are queued. UDP
+        parameters beyond METER_BACKLOG drop the oldest queued one.
+        connection_callback is called with False when the TCP link drops and
+        with True once it has been re-established and resynced.
+
+        With a heartbeat_interval, a KeepAlive get is sent whenever nothing
+        has been received over TCP for that long, and the link is treated as
+        dead after heartbeat_misses of them go unanswered. 0 falls back to a
+        fire-and-forget keepalive every KEEPALIVE_INTERVAL.
+
+        With a send_rate, outbound messages are limited to that many per
+        second in bursts of up to send_burst. With or without one, a set
+        that is still waiting to be written is replaced by a newer set of
+        the same parameters instead of both being sent; see _queue_tcp.
+        """
         self.host = host
+        self.port = port
         self.update_callback = update_callback
+        self.meter_callback = meter_callback
+        self.connection_callback = connection_callback
         self._tcp_reader: Optional[asyncio.StreamReader] = None
         self._tcp_writer: Optional[asyncio.StreamWriter] = None
-        self._udp_transport: Optional[asyncio.DatagramTransport] = None
-        self._udp_protocol: Optional[asyncio.DatagramProtocol] = None
+        self._udp_hub: Optional[AZMUDPHub] = None
+        self._udp_address: Optional[str] = None
         self._keepalive_task: Optional[asyncio.Task] = None
         self._tcp_listener_task: Optional[asyncio.Task] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Outgoing messages, one queue per priority
+        self._outboxes: tuple[deque[_Outgoing], ...] = (deque(), deque(), deque())
+        self._outbox_event = asyncio.Event()
+        # Queued sets by the parameters they set, for coalescing, and the
+        # key of the queued set each parameter belongs to
+        self._queued_sets: dict[tuple, _Outgoing] = {}
+        self._set_keys: dict[str, tuple] = {}
+        self._send_rate = send_rate
+        self._send_burst = send_burst
         self._connected = False
-        self._subscriptions: set[str] = set()
+        # Parameters we want subscribed; replayed after a reconnect
+        self._subscriptions: dict[str, str] = {}
+        self._request_ids = itertools.count(1)
+        self._pending_requests: dict[int, _PendingRequest] = {}
+        self._pending_by_param: dict[str, deque[int]] = {}
+        self._last_rtt: Optional[float] = None
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_misses = heartbeat_misses
+        self._last_rx = 0.0
+        self._last_tx = 0.0
+        self._control_queue: deque[dict[str, Any]] = deque()
+        self._meter_queue: deque[dict[str, Any]] = deque(maxlen=METER_BACKLOG)
+        self._control_drained = asyncio.Event()
+        self._drain_handle: Optional[asyncio.Handle] = None
+        # Records all traffic while set; see capture.py
+        self.capture: Optional[CaptureWriter] = None
+        self.stats = LinkStats()
+
+    async def connect(self, meters: bool = True) -> bool:
+        """Connect to the AZM device via TCP and UDP.
 
-    async def connect(self) -> bool:
-        """Connect to the AZM device via TCP and UDP."""
+        With meters False only the TCP control connection is opened, which
+        is all that is needed to read parameters. Meters are optional: if
+        the UDP port cannot be opened, the control connection is kept and
+        meters stay silent.
+        """
+        self._closing = False
         try:
             # Connect TCP
-            self._tcp_reader, self._tcp_writer = await asyncio.open_connection(
-                self.host, TCP_PORT
-            )
-            _LOGGER.info("Connected to AZM device at %s:%d via TCP", self.host, TCP_PORT)
+            await self._open_tcp()
 
-            # Setup UDP
-            loop = asyncio.get_event_loop()
-            self._udp_transport, self._udp_protocol = await loop.create_datagram_endpoint(
-                lambda: AZMUDPProtocol(self._handle_udp_message),
-                local_addr=('0.0.0.0', 0)
-            )
-            _LOGGER.info("UDP listener created for AZM device")
+            # Route meter datagrams from this device to us
+            if meters:
+                try:
+                    self._udp_hub = await AZMUDPHub.acquire()
+                except OSError as err:
+                    _LOGGER.warning(
+                        "Cannot listen for meters on UDP port %d, continuing "
+                        "without them: %s", UDP_PORT, err
+                    )
+                else:
+                    self._route_udp()
 
             self._connected = True
 
             # Start keepalive task
             self._keepalive_task = asyncio.create_task(self._keepalive_loop())
 
-            # Start TCP listener task
-            self._tcp_listener_task = asyncio.create_task(self._tcp_listener())
+            self._start_tcp_tasks()
 
             return True
 
         except Exception as err:
             _LOGGER.error("Failed to connect to AZM device: %s", err)
+            if self._tcp_writer:
+                self._tcp_writer.close()
             return False
 
+    def _route_udp(self):
+        """Register the device's address with the UDP hub."""
+        if self._udp_hub is None:
+            return
+        peer = self._tcp_writer.get_extra_info("peername") if self._tcp_writer else None
+        address = peer[0] if peer else self.host
+        if address == self._udp_address:
+            return
+        if self._udp_address:
+            self._udp_hub.unregister(self._udp_address, self._handle_udp_message)
+        self._udp_hub.register(address, self._handle_udp_message)
+        self._udp_address = address
+
+    async def _open_tcp(self):
+        """Open the TCP control connection."""
+        self._tcp_reader, self._tcp_writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), CONNECT_TIMEOUT
+        )
+        # Priorities only work on data we still hold: keep the kernel and
+        # transport buffers small so drain() waits for the device instead of
+        # letting a whole sub/get storm pile up ahead of the next set.
+        sock = self._tcp_writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_BYTES)
+        self._tcp_writer.transport.set_write_buffer_limits(high=WRITE_BATCH_BYTES)
+        _LOGGER.info("Connected to AZM device at %s:%d via TCP", self.host, self.port)
+
+    def _start_tcp_tasks(self):
+        """Start the TCP listener and writer tasks."""
+        self._last_rx = self._last_tx = asyncio.get_running_loop().time()
+        self._tcp_listener_task = asyncio.create_task(self._tcp_listener())
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
     async def disconnect(self):
         """Disconnect from the AZM device."""
+        self._closing = True
         self._connected = False
 
         # Cancel tasks
-        if self._keepalive_task:
-            self._keepalive_task.cancel()
-            try:
-                await self._keepalive_task
-            except asyncio.CancelledError:
-                pass
-
-        if self._tcp_listener_task:
-            self._tcp_listener_task.cancel()
-            try:
-                await self._tcp_listener_task
-            except asyncio.CancelledError:
-                pass
+        await _cancel_task(self._reconnect_task)
+        await _cancel_task(self._keepalive_task)
+        await _cancel_task(self._tcp_listener_task)
+        await _cancel_task(self._writer_task)
+        self._fail_outbox()
+        self._fail_requests()
 
         # Close TCP
         if self._tcp_writer:
             self._tcp_writer.close()
-            await self._tcp_writer.wait_closed()
+            try:
+                await asyncio.wait_for(self._tcp_writer.wait_closed(), CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # The device stopped reading; drop what is still buffered
+                self._tcp_writer.transport.abort()
+            except (ConnectionError, OSError):
+                pass
 
-        # Close UDP
-        if self._udp_transport:
-            self._udp_transport.close()
+        # Release UDP
+        if self._udp_hub:
+            if self._udp_address:
+                self._udp_hub.unregister(self._udp_address, self._handle_udp_message)
+                self._udp_address = None
+            self._udp_hub.release()
+            self._udp_hub = None
 
         _LOGGER.info("Disconnected from AZM device")
 
     async def _keepalive_loop(self):
         """Send periodic keepalive messages."""
-        while self._connected:
+        if self._heartbeat_interval > 0:
+            await self._heartbeat_loop()
+            return
+
+        while not self._closing:
             try:
                 await asyncio.sleep(KEEPALIVE_INTERVAL)
-                await self.send_get("KeepAlive", "str")
+                if self._connected:
+                    await self.send_get("KeepAlive", "str")
             except asyncio.CancelledError:
                 break
             except Exception as err:
                 _LOGGER.error("Keepalive error: %s", err)
 
+    async def _heartbeat_loop(self):
+        """Check the link with KeepAlive gets whenever it goes quiet.
+
+        Any inbound TCP traffic proves the link is alive, so a busy link is
+        never pinged; an idle one is pinged every heartbeat_interval, and at
+        least every KEEPALIVE_INTERVAL we have sent something ourselves.
+        """
+        loop = asyncio.get_running_loop()
+        interval = self._heartbeat_interval
+        misses = 0
+        while not self._closing:
+            try:
+                if not self._connected:
+                    misses = 0
+                    await asyncio.sleep(interval)
+                    continue
+
+                now = loop.time()
+                due = min(self._last_rx + interval, self._last_tx + KEEPALIVE_INTERVAL)
+                if now < due:
+                    await asyncio.sleep(due - now)
+                    continue
+
+                sent_at = now
+                self.stats.heartbeats += 1
+                try:
+                    await self.get("KeepAlive", "str", timeout=interval)
+                except asyncio.TimeoutError:
+                    if self._last_rx > sent_at:
+                        # Something else arrived; the device is just slow
+                        misses = 0
+                        continue
+                    misses += 1
+                    self.stats.heartbeat_misses += 1
+                    _LOGGER.debug(
+                        "Heartbeat %d/%d to AZM device at %s unanswered",
+                        misses, self._heartbeat_misses, self.host
+                    )
+                    if misses >= self._heartbeat_misses and self._connected:
+                        _LOGGER.warning(
+                            "AZM device at %s stopped answering heartbeats, reconnecting",
+                            self.host
+                        )
+                        self.stats.dead_links += 1
+                        misses = 0
+                        self._connection_lost()
+                    continue
+                except AZMError:
+                    # Rejected or connection lost; either way the link state
+                    # is already known.
+                    pass
+                misses = 0
+
+            except asyncio.CancelledError:
+                break
+            except Exception as err:
+                _LOGGER.error("Heartbeat error: %s", err)
+
     async def _tcp_listener(self):
         """Listen for TCP messages from the device."""
-        buffer = ""
+        framer = LineFramer()
+        loop = asyncio.get_running_loop()
         while self._connected and self._tcp_reader:
             try:
-                data = await self._tcp_reader.read(4096)
+                data = await self._tcp_reader.read(READ_SIZE)
                 if not data:
                     _LOGGER.warning("TCP connection closed by device")
                     break
+                self._last_rx = loop.time()
+                if self.capture is not None:
+                    self.capture.record(TCP_IN, data)
 
-                buffer += data.decode('utf-8')
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line:
-                        await self._handle_tcp_message(line)
+                for line in framer.feed(data):
+                    self._handle_tcp_message(line)
+
+                # Lossless backpressure: stop reading until the queued
+                # control updates have been handed over.
+                if len(self._control_queue) >= CONTROL_HIGH_WATER:
+                    self._control_drained.clear()
+                    await self._control_drained.wait()
 
             except asyncio.CancelledError:
-                break
+                return
             except Exception as err:
                 _LOGGER.error("TCP listener error: %s", err)
                 break
 
-    async def _handle_tcp_message(self, message: str):
+        if self._connected and not self._closing:
+            self._connection_lost()
+
+    def _connection_lost(self):
+        """Tear down the dead TCP link and start reconnecting.
+
+        A link lost while a reconnect attempt is still resyncing is left to
+        that attempt, which backs off and tries again.
+        """
+        self._connected = False
+        if self._writer_task:
+            self._writer_task.cancel()
+        if self._tcp_listener_task and self._tcp_listener_task is not asyncio.current_task():
+            self._tcp_listener_task.cancel()
+        if self._tcp_writer:
+            # Nothing buffered for a dead link will be delivered; do not
+            # wait for it to drain.
+            self._tcp_writer.transport.abort()
+        self._fail_outbox()
+        self._fail_requests()
+
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            return
+
+        if self.connection_callback:
+            self.connection_callback(False)
+        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        """Reconnect with jittered exponential backoff, then resync."""
+        attempt = 0
+        while not self._closing:
+            delay = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2 ** attempt)
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            attempt += 1
+
+            try:
+                await self._open_tcp()
+            except (OSError, asyncio.TimeoutError) as err:
+                _LOGGER.debug(
+                    "Reconnect attempt %d to AZM device at %s failed: %s",
+                    attempt, self.host, err
+                )
+                continue
+
+            self._connected = True
+            self._start_tcp_tasks()
+            self._route_udp()
+
+            # The device forgot our subscriptions with the old connection
+            params = list(self._subscriptions.items())
+            resynced = await self.subscribe_multiple(params)
+            resynced = await self.get_multiple(params) and resynced
+            if not (resynced and self._connected):
+                # Booting devices often accept a connection and then reset it
+                _LOGGER.debug(
+                    "AZM device at %s dropped the connection while resyncing",
+                    self.host
+                )
+                if self._connected:
+                    self._connection_lost()
+                continue
+
+            self.stats.reconnects += 1
+            _LOGGER.info(
+                "Reconnected to AZM device at %s, resubscribed to %d parameters",
+                self.host, len(params)
+            )
+
+            if self.connection_callback:
+                self.connection_callback(True)
+            return
+
+    def _handle_tcp_message(self, message: str):
         """Handle incoming TCP message."""
         try:
             data = json.loads(message)
             method = data.get("method")
+            request_id = data.get("id")
+            self.stats.messages_in[method or "response"] += 1
+
+            if "error" in data:
+                self._reject_request(request_id, data["error"])
+                return
+
+            if method is None and "result" in data:
+                # Plain JSON-RPC response to a request carrying an id
+                method = "getResp"
+                data["params"] = data["result"]
 
             if method in ("update", "getResp"):
                 params = data.get("params", [])
@@ -133,16 +494,22 @@ class AZMClient:
                     params = [params]
 
                 for param_data in params:
-                    if self.update_callback:
-                        await self.update_callback(param_data)
+                    if method == "getResp" and self._pending_requests:
+                        self._resolve_request(request_id, param_data)
+                self._control_queue.extend(params)
+                self._schedule_drain()
 
         except json.JSONDecodeError:
+            self.stats.json_errors += 1
             _LOGGER.warning("Invalid JSON received: %s", message)
         except Exception as err:
             _LOGGER.error("Error handling TCP message: %s", err)
 
     def _handle_udp_message(self, message: str):
         """Handle incoming UDP message (for meter updates)."""
+        self.stats.udp_datagrams += 1
+        if self.capture is not None:
+            self.capture.record(UDP_IN, message.encode("utf-8"))
         try:
             data = json.loads(message)
             method = data.get("method")
@@ -152,30 +519,229 @@ class AZMClient:
                 if isinstance(params, dict):
                     params = [params]
 
-                for param_data in params:
-                    if self.update_callback:
-                        asyncio.create_task(self.update_callback(param_data))
+                queue = self._meter_queue
+                overflow = len(queue) + len(params) - METER_BACKLOG
+                if overflow > 0:
+                    self.stats.meter_drops += overflow
+                queue.extend(params)
+                self._schedule_drain()
 
         except json.JSONDecodeError:
+            self.stats.json_errors += 1
             _LOGGER.warning("Invalid JSON received via UDP: %s", message)
         except Exception as err:
             _LOGGER.error("Error handling UDP message: %s", err)
 
+    def _schedule_drain(self) -> None:
+        """Hand queued parameters to the callbacks on the next loop iteration."""
+        if self._drain_handle is None:
+            self._drain_handle = asyncio.get_running_loop().call_soon(self._drain_inbound)
+
+    def _drain_inbound(self) -> None:
+        """Pass every queued parameter to its callback, control first."""
+        self._drain_handle = None
+        stats = self.stats
+        stats.ingest_batches += 1
+        backlog = len(self._control_queue) + len(self._meter_queue)
+        if backlog > stats.ingest_backlog_max:
+            stats.ingest_backlog_max = backlog
+
+        control = self._control_queue
+        self._control_queue = deque()
+        self._control_drained.set()
+        update_callback = self.update_callback
+        if update_callback:
+            _dispatch(control, update_callback)
+
+        meters = self._meter_queue
+        self._meter_queue = deque(maxlen=METER_BACKLOG)
+        meter_callback = self.meter_callback or update_callback
+        if meter_callback:
+            _dispatch(meters, meter_callback)
+
     async def _send_tcp(self, message: dict) -> bool:
-        """Send a message via TCP."""
+        """Send a message via TCP and wait until it has been written."""
         if not self._tcp_writer or not self._connected:
             _LOGGER.error("Not connected to AZM device")
             return False
 
-        try:
-            json_str = json.dumps(message) + "\n"
-            self._tcp_writer.write(json_str.encode('utf-8'))
-            await self._tcp_writer.drain()
+        return await self._queue_tcp(message)
+
+    async def _send_chunked(self, method: str, items: list[dict[str, Any]]) -> bool:
+        """Send items as batched messages and wait until all are written.
+
+        Every chunk is queued before waiting, so they all go out in the
+        same write when the writer is idle.
+        """
+        if not items:
             return True
-        except Exception as err:
-            _LOGGER.error("Failed to send TCP message: %s", err)
+        if not self._tcp_writer or not self._connected:
+            _LOGGER.error("Not connected to AZM device")
             return False
 
+        results = await asyncio.gather(*(
+            self._queue_tcp({"jsonrpc": "2.0", "method": method, "params": chunk})
+            for chunk in _chunked(items)
+        ))
+        return all(results)
+
+    def _queue_tcp(self, message: dict) -> asyncio.Future:
+        """Queue a message for the writer task.
+
+        The returned future resolves to True once the batch containing the
+        message has been written and drained, or False if that failed. A set
+        of exactly the parameters of a set that is still queued replaces that
+        set's values; both callers then wait for the one message. Once any
+        other message touching one of its parameters is queued, such as a
+        bmp, the queued set is no longer replaced, so the two keep their
+        order.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        stats = self.stats
+        params = _message_params(message)
+        key = tuple(params) if message["method"] == "set" else None
+        if self._queued_sets:
+            queued = self._queued_sets.get(key) if key is not None else None
+            if queued is not None:
+                queued.data = data
+                queued.futures.append(future)
+                stats.superseded += 1
+                return future
+            for param in params:
+                stale = self._set_keys.get(param)
+                if stale is not None:
+                    self._forget_set(stale)
+        item = _Outgoing(data, future, loop.time(), key)
+        if key is not None:
+            self._queued_sets[key] = item
+            for param in key:
+                self._set_keys[param] = key
+        self._outboxes[_priority(message)].append(item)
+        self._outbox_event.set()
+
+        stats.messages_out[message["method"]] += 1
+        stats.queue_depth = sum(len(outbox) for outbox in self._outboxes)
+        if stats.queue_depth > stats.queue_depth_max:
+            stats.queue_depth_max = stats.queue_depth
+        return future
+
+    def _forget_set(self, key: tuple) -> None:
+        """Stop coalescing into the queued set of key."""
+        del self._queued_sets[key]
+        for param in key:
+            self._set_keys.pop(param, None)
+
+    def _next_batch(self, limit: Optional[int] = None) -> list[_Outgoing]:
+        """Take the next batch to write, most urgent messages first.
+
+        Interactive messages and keepalives are always taken in full. Bulk
+        messages fill the rest of WRITE_BATCH_BYTES, but get at least
+        BULK_MIN_SHARE of it even when interactive traffic is heavy, so a
+        sub/get storm keeps moving without delaying user commands by more
+        than one batch. With a limit, at most that many messages are taken,
+        again keeping BULK_MIN_SHARE of them for bulk messages.
+        """
+        interactive, keepalive, bulk = self._outboxes
+        urgent = len(interactive) + len(keepalive)
+        if limit is not None and urgent > limit:
+            urgent = limit - min(len(bulk), int(limit * BULK_MIN_SHARE))
+
+        batch: list[_Outgoing] = []
+        if interactive:
+            now = asyncio.get_running_loop().time()
+            queued_sets = self._queued_sets
+            wait = self.stats.interactive_wait
+            while interactive and len(batch) < urgent:
+                item = interactive.popleft()
+                if item.key is not None and queued_sets.get(item.key) is item:
+                    self._forget_set(item.key)
+                wait.record(now - item.queued_at)
+                batch.append(item)
+        while keepalive and len(batch) < urgent:
+            batch.append(keepalive.popleft())
+
+        size = sum(len(item.data) for item in batch)
+        budget = max(WRITE_BATCH_BYTES - size, int(WRITE_BATCH_BYTES * BULK_MIN_SHARE))
+        count = len(bulk) if limit is None else limit - len(batch)
+        while bulk and budget > 0 and count > 0:
+            item = bulk.popleft()
+            budget -= len(item.data)
+            count -= 1
+            batch.append(item)
+        return batch
+
+    async def _writer_loop(self):
+        """Write queued messages to the device, one write and drain per batch.
+
+        Messages queued while the previous batch was draining go out
+        together in a single write, interactive ones first; see _next_batch.
+        With a send rate, a batch holds no more messages than the token
+        bucket allows, and the writer sleeps until it refills.
+        """
+        loop = asyncio.get_running_loop()
+        bucket = None
+        if self._send_rate > 0:
+            bucket = _TokenBucket(self._send_rate, self._send_burst, loop.time())
+        throttled = False
+        while self._connected and self._tcp_writer:
+            try:
+                await self._outbox_event.wait()
+                self._outbox_event.clear()
+                stats = self.stats
+                limit = None
+                if bucket is not None:
+                    limit = bucket.available(loop.time())
+                    if limit < 1:
+                        # Queued sets keep coalescing while we wait
+                        delay = bucket.delay()
+                        stats.throttle_wait.record(delay)
+                        throttled = True
+                        await asyncio.sleep(delay)
+                        self._outbox_event.set()
+                        continue
+                batch = self._next_batch(limit)
+                if not batch:
+                    continue
+                if bucket is not None:
+                    bucket.consume(len(batch))
+                if throttled:
+                    stats.throttled += len(batch)
+                    throttled = False
+                if any(self._outboxes):
+                    # The rest waits for the next round
+                    self._outbox_event.set()
+
+                stats.queue_depth = sum(len(outbox) for outbox in self._outboxes)
+                success = False
+                try:
+                    payload = b"".join(item.data for item in batch)
+                    if self.capture is not None:
+                        self.capture.record(TCP_OUT, payload)
+                    started = loop.time()
+                    self._tcp_writer.write(payload)
+                    await self._tcp_writer.drain()
+                    self._last_tx = loop.time()
+                    stats.drain_wait.record(self._last_tx - started)
+                    success = True
+                except (ConnectionError, OSError) as err:
+                    _LOGGER.error("Failed to send TCP message: %s", err)
+                finally:
+                    for item in batch:
+                        item.resolve(success)
+
+            except asyncio.CancelledError:
+                break
+
+    def _fail_outbox(self) -> None:
+        """Resolve every queued message as not sent."""
+        self._queued_sets.clear()
+        self._set_keys.clear()
+        for outbox in self._outboxes:
+            while outbox:
+                outbox.popleft().resolve(False)
+
     async def send_set(self, param: str, value: Any, fmt: str = "val") -> bool:
         """Set a parameter value."""
         message = {
@@ -188,6 +754,13 @@ class AZMClient:
         }
         return await self._send_tcp(message)
 
+    async def set_multiple(self, values: list[tuple[str, Any, str]]) -> bool:
+        """Set several parameter values with batched set messages.
+
+        values holds (param, value, fmt) tuples.
+        """
+        return await self._send_chunked("set", [{"param": p, f: v} for p, v, f in values])
+
     async def send_bump(self, param: str, value: Any, fmt: str = "val") -> bool:
         """Bump (increment/decrement) a parameter value."""
         message = {
@@ -212,6 +785,91 @@ class AZMClient:
         }
         return await self._send_tcp(message)
 
+    async def get(self, param: str, fmt: str = "val", timeout: float = GET_TIMEOUT) -> Any:
+        """Get a parameter value and wait for the device's answer.
+
+        The request carries a JSON-RPC id and is matched to its getResp by
+        that id, or by parameter name if the device omits it. Raises
+        asyncio.TimeoutError if the request cannot be written or no answer
+        arrives within timeout, and AZMError if the device rejects the
+        request or the connection is lost.
+        """
+        if not self._tcp_writer or not self._connected:
+            raise AZMError("Not connected to AZM device")
+
+        loop = asyncio.get_running_loop()
+        request_id = next(self._request_ids)
+        future = loop.create_future()
+        self._pending_requests[request_id] = _PendingRequest(param, future, loop.time())
+        self._pending_by_param.setdefault(param, deque()).append(request_id)
+
+        message = {
+            "jsonrpc": "2.0",
+            "method": "get",
+            "params": {
+                "param": param,
+                "fmt": fmt
+            },
+            "id": request_id
+        }
+        try:
+            # A half-open link stalls the write itself, so time both
+            async with asyncio.timeout(timeout):
+                if not await self._send_tcp(message):
+                    raise AZMError(f"Failed to send get for {param}")
+                param_data = await future
+        finally:
+            self._forget_request(request_id)
+
+        if fmt in param_data:
+            return param_data[fmt]
+        for key in ("val", "pct", "str"):
+            if key in param_data:
+                return param_data[key]
+        return None
+
+    def _resolve_request(self, request_id: Any, param_data: dict[str, Any]) -> None:
+        """Complete the pending get a getResp parameter answers."""
+        param = param_data.get("param")
+        pending = self._pending_requests.get(request_id)
+        if pending is None or pending.param != param:
+            # Batched or id-less answers are matched oldest-first by param
+            ids = self._pending_by_param.get(param)
+            if not ids:
+                return
+            pending = self._pending_requests[ids[0]]
+
+        if not pending.future.done():
+            self._last_rtt = asyncio.get_running_loop().time() - pending.sent_at
+            self.stats.get_rtt.record(self._last_rtt)
+            pending.future.set_result(param_data)
+
+    def _reject_request(self, request_id: Any, error: Any) -> None:
+        """Fail the pending get the device answered with an error."""
+        pending = self._pending_requests.get(request_id)
+        if pending is None:
+            _LOGGER.warning("AZM device reported an error: %s", error)
+            return
+        if not pending.future.done():
+            pending.future.set_exception(AZMError(f"{pending.param}: {error}"))
+
+    def _forget_request(self, request_id: int) -> None:
+        """Remove a finished get from the pending tables."""
+        pending = self._pending_requests.pop(request_id, None)
+        if pending is None:
+            return
+        ids = self._pending_by_param.get(pending.param)
+        if ids is not None:
+            ids.remove(request_id)
+            if not ids:
+                del self._pending_by_param[pending.param]
+
+    def _fail_requests(self) -> None:
+        """Fail every pending get because the connection went away."""
+        for pending in self._pending_requests.values():
+            if not pending.future.done():
+                pending.future.set_exception(AZMError("Connection to AZM device closed"))
+
     async def subscribe(self, param: str, fmt: str = "val") -> bool:
         """Subscribe to parameter updates."""
         message = {
@@ -222,22 +880,17 @@ class AZMClient:
                 "fmt": fmt
             }
         }
-        success = await self._send_tcp(message)
-        if success:
-            self._subscriptions.add(param)
-        return success
+        self._subscriptions[param] = fmt
+        return await self._send_tcp(message)
 
     async def subscribe_multiple(self, params: list[tuple[str, str]]) -> bool:
         """Subscribe to multiple parameters at once."""
-        message = {
-            "jsonrpc": "2.0",
-            "method": "sub",
-            "params": [{"param": p, "fmt": f} for p, f in params]
-        }
-        success = await self._send_tcp(message)
-        if success:
-            self._subscriptions.update(p for p, _ in params)
-        return success
+        self._subscriptions.update(params)
+        return await self._send_chunked("sub", [{"param": p, "fmt": f} for p, f in params])
+
+    async def get_multiple(self, params: list[tuple[str, str]]) -> bool:
+        """Get multiple parameter values at once."""
+        return await self._send_chunked("get", [{"param": p, "fmt": f} for p, f in params])
 
     async def unsubscribe(self, param: str, fmt: str = "val") -> bool:
         """Unsubscribe from parameter updates."""
@@ -249,21 +902,311 @@ class AZMClient:
                 "fmt": fmt
             }
         }
-        success = await self._send_tcp(message)
-        if success:
-            self._subscriptions.discard(param)
-        return success
+        self._subscriptions.pop(param, None)
+        return await self._send_tcp(message)
+
+    async def unsubscribe_multiple(self, params: list[tuple[str, str]]) -> bool:
+        """Unsubscribe from multiple parameters at once."""
+        for param, _ in params:
+            self._subscriptions.pop(param, None)
+        return await self._send_chunked("unsub", [{"param": p, "fmt": f} for p, f in params])
 
     @property
     def connected(self) -> bool:
         """Return connection status."""
         return self._connected
 
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of parameters subscribed on the device."""
+        return len(self._subscriptions)
+
+    @property
+    def last_rtt(self) -> Optional[float]:
+        """Return the round-trip time of the last answered get, in seconds."""
+        return self._last_rtt
+
+
+async def probe(host: str, port: int = TCP_PORT, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Return True if an AZM device answers on host.
+
+    Opens a bare TCP connection, asks for KeepAlive and waits for any
+    JSON-RPC reply, all within timeout; no client, UDP socket or background
+    task is created.
+    """
+    writer = None
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                b'{"jsonrpc": "2.0", "method": "get", '
+                b'"params": {"param": "KeepAlive", "fmt": "str"}, "id": 1}\n'
+            )
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+    except (OSError, asyncio.TimeoutError, ValueError):
+        return False
+    finally:
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+    return isinstance(reply, dict) and reply.get("jsonrpc") == "2.0"
+
+
+async def discover(
+    hosts: Iterable[str],
+    port: int = TCP_PORT,
+    timeout: float = PROBE_TIMEOUT,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+) -> list[str]:
+    """Probe hosts in parallel and return those with an AZM device.
+
+    At most concurrency probes run at once, so a /24 scan takes a few
+    probe timeouts rather than 254 of them.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(host: str) -> Optional[str]:
+        async with semaphore:
+            return host if await probe(host, port, timeout) else None
+
+    found = await asyncio.gather(*(check(host) for host in hosts))
+    return [host for host in found if host is not None]
+
+
+async def detect_capabilities(
+    host: str,
+    port: int = TCP_PORT,
+    max_zones: int = 16,
+    max_sources: int = 16,
+    max_groups: int = 8,
+    timeout: float = PROBE_TIMEOUT,
+) -> Optional[dict[str, int]]:
+    """Find how many zones, sources and groups a device has.
+
+    Reads ZoneName_i, SourceName_i and GroupActive_i for every possible
+    channel concurrently over one connection; a family's count is the
+    number of leading channels the device answered. Returns None if the
+    device cannot be reached.
+    """
+    client = AZMClient(host, port=port, heartbeat_interval=0)
+    if not await client.connect(meters=False):
+        return None
+    try:
+        families = (
+            ("zones", "ZoneName", "str", max_zones),
+            ("sources", "SourceName", "str", max_sources),
+            ("groups", "GroupActive", "val", max_groups),
+        )
+        requests = [
+            client.get(f"{family}_{index}", fmt, timeout)
+            for _, family, fmt, count in families
+            for index in range(count)
+        ]
+        results = iter(await asyncio.gather(*requests, return_exceptions=True))
+        counts = {}
+        for kind, _, _, count in families:
+            answered = [not isinstance(next(results), Exception) for _ in range(count)]
+            counts[kind] = answered.index(False) if False in answered else count
+        return counts
+    finally:
+        await client.disconnect()
+
+
+class LineFramer:
+    """Incremental newline framer for the TCP control stream.
+
+    Incoming bytes are appended to a single bytearray and scanned in place
+    for newlines, resuming where the previous scan stopped. Only complete
+    frames are decoded, so multi-byte UTF-8 characters split across reads
+    survive intact, and consumed bytes are trimmed once per feed instead of
+    once per line. Frames longer than max_frame_size are dropped.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        """Initialize the framer."""
+        self._buffer = bytearray()
+        self._scan_from = 0
+        self._max_frame_size = max_frame_size
+        self._discarding = False
+        self.oversized_frames = 0
+
+    def feed(self, data: bytes) -> list[str]:
+        """Add received bytes and return every complete frame."""
+        buffer = self._buffer
+        buffer += data
+        frames: list[str] = []
+        start = 0
+        pos = buffer.find(b"\n", self._scan_from)
+
+        with memoryview(buffer) as view:
+            while pos != -1:
+                if self._discarding:
+                    # Tail of a frame we already gave up on
+                    self._discarding = False
+                elif pos - start > self._max_frame_size:
+                    self._drop_oversized()
+                else:
+                    end = pos
+                    if end > start and buffer[end - 1] == 0x0D:
+                        end -= 1
+                    if end > start:
+                        frames.append(_utf8_decode(view[start:end], "replace", True)[0])
+                start = pos + 1
+                pos = buffer.find(b"\n", start)
+
+        if start:
+            del buffer[:start]
+
+        if len(buffer) > self._max_frame_size:
+            if not self._discarding:
+                self._drop_oversized()
+                self._discarding = True
+            buffer.clear()
+
+        self._scan_from = len(buffer)
+        return frames
+
+    def _drop_oversized(self) -> None:
+        """Account for a frame that exceeded the size limit."""
+        self.oversized_frames += 1
+        _LOGGER.warning(
+            "Dropping TCP message larger than %d bytes", self._max_frame_size
+        )
+
+
+def _priority(message: dict) -> int:
+    """Return the outbound priority of a message."""
+    method = message["method"]
+    if method in ("set", "bmp"):
+        return PRIORITY_INTERACTIVE
+    params = message.get("params")
+    if isinstance(params, dict) and params.get("param") == "KeepAlive":
+        return PRIORITY_KEEPALIVE
+    return PRIORITY_BULK
+
+
+def _message_params(message: dict) -> list[str]:
+    """Return the parameters a message refers to."""
+    params = message.get("params")
+    if isinstance(params, dict):
+        return [params["param"]]
+    if isinstance(params, list):
+        return [item["param"] for item in params]
+    return []
+
+
+def _dispatch(items: deque, callback: Callable[[Any], None]) -> None:
+    """Call callback for every item, logging failures without stopping."""
+    remaining = iter(items)
+    while True:
+        try:
+            for item in remaining:
+                callback(item)
+            return
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error handling update from AZM device")
+
+
+async def _cancel_task(task: Optional[asyncio.Task]) -> None:
+    """Cancel a task and wait for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _chunked(params: list) -> list[list]:
+    """Split a parameter list into batches the device will accept."""
+    return [
+        params[i:i + MAX_BATCH_PARAMS]
+        for i in range(0, len(params), MAX_BATCH_PARAMS)
+    ]
+
+
+class AZMUDPHub:
+    """Process-wide UDP endpoint shared by every AZMClient.
+
+    A single socket on UDP_PORT receives meter datagrams for all devices.
+    Each datagram is routed by its source address to the clients
+    registered for that device; traffic from unknown hosts is dropped.
+    """
+
+    _instance: Optional["AZMUDPHub"] = None
+    _lock = asyncio.Lock()
+
+    def __init__(self):
+        """Initialize the hub."""
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._routes: dict[str, list[Callable[[str], None]]] = {}
+        self._refs = 0
+        self.unknown_datagrams = 0
+
+    @classmethod
+    async def acquire(cls) -> "AZMUDPHub":
+        """Return the shared hub, opening its socket on first use."""
+        async with cls._lock:
+            hub = cls._instance
+            if hub is None:
+                hub = cls()
+                loop = asyncio.get_running_loop()
+                hub._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: AZMUDPProtocol(hub.dispatch),
+                    local_addr=('0.0.0.0', UDP_PORT)
+                )
+                _LOGGER.info("UDP meter listener created on port %d", UDP_PORT)
+                cls._instance = hub
+            hub._refs += 1
+            return hub
+
+    @classmethod
+    def current(cls) -> Optional["AZMUDPHub"]:
+        """Return the shared hub if one is open."""
+        return cls._instance
+
+    def release(self):
+        """Drop a reference to the hub, closing the socket after the last."""
+        self._refs -= 1
+        if self._refs > 0:
+            return
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        if AZMUDPHub._instance is self:
+            AZMUDPHub._instance = None
+        _LOGGER.info("UDP meter listener closed")
+
+    def register(self, address: str, callback: Callable[[str], None]):
+        """Route datagrams from a device address to a callback."""
+        self._routes.setdefault(address, []).append(callback)
+
+    def unregister(self, address: str, callback: Callable[[str], None]):
+        """Stop routing datagrams from a device address to a callback."""
+        callbacks = self._routes.get(address)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._routes[address]
+
+    def dispatch(self, message: str, addr: tuple):
+        """Hand a datagram to the clients of the device that sent it."""
+        callbacks = self._routes.get(addr[0])
+        if not callbacks:
+            self.unknown_datagrams += 1
+            _LOGGER.debug("Dropping UDP datagram from unknown host %s", addr[0])
+            return
+        for callback in callbacks:
+            callback(message)
+
 
 class AZMUDPProtocol(asyncio.DatagramProtocol):
     """UDP Protocol for receiving meter updates."""
 
-    def __init__(self, message_callback: Callable):
+    def __init__(self, message_callback: Callable[[str, tuple], None]):
         """Initialize the UDP protocol."""
         self.message_callback = message_callback
 
@@ -272,6 +1215,6 @@ class AZMUDPProtocol(asyncio.DatagramProtocol):
         try:
             message = data.decode('utf-8').strip()
             if message:
-                self.message_callback(message)
+                self.message_callback(message, addr)
         except Exception as err:
             _LOGGER.error("Error processing UDP datagram: %s", err)
@@ -0,0 +1,116 @@
+"""Traffic capture files for the AtlasIED AZM link.
+
+A capture starts with MAGIC and holds one record per TCP read, UDP datagram
+or outbound TCP write: a RECORD header (seconds since the capture started,
+record kind, payload length) followed by the raw payload bytes. Records are
+only ever appended, so a capture cut short by a crash is still readable up
+to its last complete record.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from typing import BinaryIO, Iterator, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"AZMCAP1\n"
+RECORD = struct.Struct("<dBI")
+
+# Record kinds
+TCP_IN = 0
+UDP_IN = 1
+TCP_OUT = 2
+
+FLUSH_INTERVAL = 1.0  # seconds between writes to disk
+FLUSH_SIZE = 256 * 1024  # buffered bytes that trigger an early write
+
+
+class CaptureWriter:
+    """Append-only capture of the traffic on one AZM link.
+
+    Records are buffered in memory and written by an executor job at most
+    once per FLUSH_INTERVAL, so recording never blocks the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, path: str):
+        """Initialize the writer; call async_open before recording."""
+        self.path = path
+        self.records = 0
+        self._loop = loop
+        self._file: Optional[BinaryIO] = None
+        self._buffer = bytearray()
+        self._started = time.monotonic()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._write_lock = asyncio.Lock()
+
+    async def async_open(self) -> None:
+        """Create the capture file."""
+        self._file = await self._loop.run_in_executor(None, self._open)
+        self._started = time.monotonic()
+
+    def _open(self) -> BinaryIO:
+        """Create the file and write the header (runs in the executor)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        file = open(self.path, "wb")  # pylint: disable=consider-using-with
+        file.write(MAGIC)
+        return file
+
+    def record(self, kind: int, data: bytes) -> None:
+        """Append one record."""
+        self._buffer += RECORD.pack(time.monotonic() - self._started, kind, len(data))
+        self._buffer += data
+        self.records += 1
+        if len(self._buffer) >= FLUSH_SIZE:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(FLUSH_INTERVAL)
+
+    def _schedule_flush(self, delay: float) -> None:
+        """Write the buffer to disk after delay seconds."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = self._loop.call_later(
+            delay, lambda: self._loop.create_task(self._async_flush())
+        )
+
+    async def _async_flush(self) -> None:
+        """Hand the buffered records to the executor."""
+        self._flush_handle = None
+        if not self._buffer or self._file is None:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        # Keep writes in order when a size-triggered flush overlaps a timed one
+        async with self._write_lock:
+            await self._loop.run_in_executor(None, self._file.write, data)
+
+    async def async_close(self) -> None:
+        """Write what is left and close the file."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        await self._async_flush()
+        if self._file is not None:
+            async with self._write_lock:
+                await self._loop.run_in_executor(None, self._file.close)
+            self._file = None
+        _LOGGER.info("Wrote %d records to %s", self.records, self.path)
+
+
+def read_capture(path: str) -> Iterator[tuple[float, int, bytes]]:
+    """Yield (timestamp, kind, payload) for every complete record in a capture."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an AZM capture")
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            timestamp, kind, length = RECORD.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield timestamp, kind, payload
@@ -1,6 +1,7 @@
 """Config flow for AtlasIED AZM4/AZM8 integration."""
 from __future__ import annotations
 
+import ipaddress
 import logging
 from typing import Any
 
@@ -8,79 +9,282 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .azm_client import AZMClient
+from .azm_client import detect_capabilities, discover, probe
 from .const import (
+    CONF_FADE_STEP_RATE,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSES,
+    CONF_METER_MAX_RATE,
+    CONF_METER_ON_DEMAND,
+    CONF_METER_WINDOW,
     CONF_NUM_GROUPS,
     CONF_NUM_SOURCES,
     CONF_NUM_ZONES,
+    CONF_SEND_BURST,
+    CONF_SEND_RATE,
+    CONF_STATE_FLUSH_INTERVAL,
+    CONF_SUBNET,
+    DEFAULT_FADE_STEP_RATE,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSES,
+    DEFAULT_METER_MAX_RATE,
+    DEFAULT_METER_ON_DEMAND,
+    DEFAULT_METER_WINDOW,
     DEFAULT_NUM_GROUPS,
     DEFAULT_NUM_SOURCES,
     DEFAULT_NUM_ZONES,
+    DEFAULT_SEND_BURST,
+    DEFAULT_SEND_RATE,
+    DEFAULT_STATE_FLUSH_INTERVAL,
     DOMAIN,
+    MAX_DISCOVERY_HOSTS,
+    MAX_GROUPS,
+    MAX_SOURCES,
+    MAX_ZONES,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-STEP_USER_DATA_SCHEMA = vol.Schema(
-    {
-        vol.Required(CONF_HOST): str,
-        vol.Optional(CONF_NUM_ZONES, default=DEFAULT_NUM_ZONES): vol.All(
-            vol.Coerce(int), vol.Range(min=1, max=16)
-        ),
-        vol.Optional(CONF_NUM_SOURCES, default=DEFAULT_NUM_SOURCES): vol.All(
-            vol.Coerce(int), vol.Range(min=1, max=16)
-        ),
-        vol.Optional(CONF_NUM_GROUPS, default=DEFAULT_NUM_GROUPS): vol.All(
-            vol.Coerce(int), vol.Range(min=1, max=8)
-        ),
-    }
-)
+STEP_MANUAL_DATA_SCHEMA = vol.Schema({vol.Required(CONF_HOST): str})
+
+STEP_DISCOVER_DATA_SCHEMA = vol.Schema({vol.Required(CONF_SUBNET): str})
+
+
+def _channels_schema(counts: dict[str, int]) -> vol.Schema:
+    """Return the channel count form, defaulting to the detected counts."""
+    return vol.Schema(
+        {
+            vol.Required(CONF_NUM_ZONES, default=counts[CONF_NUM_ZONES]): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_ZONES)
+            ),
+            vol.Required(CONF_NUM_SOURCES, default=counts[CONF_NUM_SOURCES]): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_SOURCES)
+            ),
+            vol.Required(CONF_NUM_GROUPS, default=counts[CONF_NUM_GROUPS]): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_GROUPS)
+            ),
+        }
+    )
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
-    client = AZMClient(data[CONF_HOST])
-
-    if not await client.connect():
+    if not await probe(data[CONF_HOST]):
         raise CannotConnect
 
-    await client.disconnect()
-
     return {"title": f"AZM Device ({data[CONF_HOST]})"}
 
 
+def _subnet_hosts(subnet: str) -> list[str]:
+    """Return the host addresses of a subnet such as 192.168.1.0/24."""
+    try:
+        network = ipaddress.ip_network(subnet.strip(), strict=False)
+    except ValueError as err:
+        raise InvalidSubnet from err
+    if network.num_addresses > MAX_DISCOVERY_HOSTS:
+        raise SubnetTooLarge
+    return [str(host) for host in network.hosts()]
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for AtlasIED AZM."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._host: str | None = None
+        self._discovered: list[str] = []
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add a device by address."""
         errors: dict[str, str] = {}
-        
+
         if user_input is not None:
             try:
-                info = await validate_input(self.hass, user_input)
+                await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                await self.async_set_unique_id(user_input[CONF_HOST])
-                self._abort_if_unique_id_configured()
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return await self._async_select_host(user_input[CONF_HOST])
+
+        return self.async_show_form(
+            step_id="manual", data_schema=STEP_MANUAL_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Scan a subnet for devices."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                hosts = _subnet_hosts(user_input[CONF_SUBNET])
+            except InvalidSubnet:
+                errors["base"] = "invalid_subnet"
+            except SubnetTooLarge:
+                errors["base"] = "subnet_too_large"
+            else:
+                configured = self._async_current_ids()
+                candidates = [host for host in hosts if host not in configured]
+                _LOGGER.debug("Probing %d hosts for AZM devices", len(candidates))
+                self._discovered = await discover(candidates)
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_devices_found"
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="discover", data_schema=STEP_DISCOVER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose one of the discovered devices."""
+        if user_input is not None:
+            return await self._async_select_host(user_input[CONF_HOST])
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(self._discovered)}),
+            description_placeholders={"count": str(len(self._discovered))},
+        )
+
+    async def _async_select_host(self, host: str) -> FlowResult:
+        """Claim the host for this flow and continue with detection."""
+        await self.async_set_unique_id(host)
+        self._abort_if_unique_id_configured()
+        self._host = host
+        return await self.async_step_detect()
+
+    async def async_step_detect(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm the channel counts detected on the device."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title=f"AZM Device ({self._host})",
+                data={CONF_HOST: self._host, **user_input},
+            )
+
+        detected = await detect_capabilities(
+            self._host, max_zones=MAX_ZONES, max_sources=MAX_SOURCES, max_groups=MAX_GROUPS
+        )
+        counts = {
+            CONF_NUM_ZONES: DEFAULT_NUM_ZONES,
+            CONF_NUM_SOURCES: DEFAULT_NUM_SOURCES,
+            CONF_NUM_GROUPS: DEFAULT_NUM_GROUPS,
+        }
+        if detected:
+            # Keep the defaults for anything the device did not answer for
+            for key, kind in (
+                (CONF_NUM_ZONES, "zones"),
+                (CONF_NUM_SOURCES, "sources"),
+                (CONF_NUM_GROUPS, "groups"),
+            ):
+                if detected[kind]:
+                    counts[key] = detected[kind]
+
+        return self.async_show_form(
+            step_id="detect",
+            data_schema=_channels_schema(counts),
+            description_placeholders={
+                "host": self._host,
+                "result": "detected" if detected else "not detected",
+            },
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle AtlasIED AZM options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_METER_WINDOW,
+                    default=options.get(CONF_METER_WINDOW, DEFAULT_METER_WINDOW),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=60)),
+                vol.Optional(
+                    CONF_METER_MAX_RATE,
+                    default=options.get(CONF_METER_MAX_RATE, DEFAULT_METER_MAX_RATE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=20)),
+                vol.Optional(
+                    CONF_STATE_FLUSH_INTERVAL,
+                    default=options.get(
+                        CONF_STATE_FLUSH_INTERVAL, DEFAULT_STATE_FLUSH_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Optional(
+                    CONF_HEARTBEAT_INTERVAL,
+                    default=options.get(
+                        CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=120)),
+                vol.Optional(
+                    CONF_HEARTBEAT_MISSES,
+                    default=options.get(CONF_HEARTBEAT_MISSES, DEFAULT_HEARTBEAT_MISSES),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Optional(
+                    CONF_METER_ON_DEMAND,
+                    default=options.get(CONF_METER_ON_DEMAND, DEFAULT_METER_ON_DEMAND),
+                ): bool,
+                vol.Optional(
+                    CONF_SEND_RATE,
+                    default=options.get(CONF_SEND_RATE, DEFAULT_SEND_RATE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+                vol.Optional(
+                    CONF_SEND_BURST,
+                    default=options.get(CONF_SEND_BURST, DEFAULT_SEND_BURST),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                vol.Optional(
+                    CONF_FADE_STEP_RATE,
+                    default=options.get(CONF_FADE_STEP_RATE, DEFAULT_FADE_STEP_RATE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=50)),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=data_schema)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
+
+
+class InvalidSubnet(HomeAssistantError):
+    """Error to indicate the subnet could not be parsed."""
+
+
+class SubnetTooLarge(HomeAssistantError):
+    """Error to indicate the subnet has too many hosts to scan."""
@@ -6,8 +6,41 @@ DOMAIN = "atlasied_azm"
 CONF_NUM_ZONES = "num_zones"
 CONF_NUM_SOURCES = "num_sources"
 CONF_NUM_GROUPS = "num_groups"
+CONF_SUBNET = "subnet"
 
 # Default values
 DEFAULT_NUM_ZONES = 8
 DEFAULT_NUM_SOURCES = 4
 DEFAULT_NUM_GROUPS = 4
+
+# Hardware limits, used to bound capability detection
+MAX_ZONES = 16
+MAX_SOURCES = 16
+MAX_GROUPS = 8
+MAX_DISCOVERY_HOSTS = 1024  # largest subnet (a /22) the config flow will scan
+
+# Options
+CONF_METER_WINDOW = "meter_window"
+CONF_METER_MAX_RATE = "meter_max_rate"
+CONF_STATE_FLUSH_INTERVAL = "state_flush_interval"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+CONF_HEARTBEAT_MISSES = "heartbeat_misses"
+CONF_METER_ON_DEMAND = "meter_on_demand"
+CONF_SEND_RATE = "send_rate"
+CONF_SEND_BURST = "send_burst"
+CONF_FADE_STEP_RATE = "fade_step_rate"
+
+DEFAULT_METER_WINDOW = 2.0  # seconds of samples kept for peak/average
+DEFAULT_METER_MAX_RATE = 1.0  # meter publishes per second, per channel
+DEFAULT_STATE_FLUSH_INTERVAL = 0.0  # seconds; 0 flushes once per loop iteration
+DEFAULT_HEARTBEAT_INTERVAL = 10.0  # seconds of silence before a heartbeat; 0 disables
+DEFAULT_HEARTBEAT_MISSES = 3  # unanswered heartbeats before reconnecting
+DEFAULT_METER_ON_DEMAND = False  # meters stream only during live metering windows
+DEFAULT_SEND_RATE = 50.0  # control messages per second to the device; 0 disables
+DEFAULT_SEND_BURST = 20  # messages sent at once before the rate applies
+DEFAULT_FADE_STEP_RATE = 10.0  # fade steps per second
+DEFAULT_FADE_DURATION = 5.0  # seconds
+DEFAULT_LIVE_METERING_DURATION = 60  # seconds
+
+# Storage
+STATE_SAVE_DELAY = 30  # seconds between a state change and writing the cache
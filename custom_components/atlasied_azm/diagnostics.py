@@ -0,0 +1,36 @@
+"""Diagnostics support for AtlasIED AZM4/AZM8."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import AZMCoordinator
+from .azm_client import AZMUDPHub
+from .const import DOMAIN
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: AZMCoordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.client
+    hub = AZMUDPHub.current()
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "connected": coordinator.connected,
+        "subscriptions": client.subscription_count,
+        "link": client.stats.as_dict(),
+        "coordinator": coordinator.stats.as_dict(),
+        "udp_unknown_datagrams": hub.unknown_datagrams if hub else 0,
+    }
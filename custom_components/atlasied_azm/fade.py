@@ -0,0 +1,164 @@
+"""Gain fades for the AtlasIED AZM4/AZM8 integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from . import AZMCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+CURVE_LINEAR = "linear"
+CURVE_LOG = "log"
+CURVES = (CURVE_LINEAR, CURVE_LOG)
+
+# Parameter families that can be faded; all are set as "pct"
+FADE_FAMILIES = ("ZoneGain", "SourceGain")
+
+
+def _progress(curve: str, fraction: float) -> float:
+    """Return how far along its change a fade is after fraction of its time.
+
+    The log curve moves quickly at first and eases into the target.
+    """
+    if curve == CURVE_LOG:
+        return math.log10(1 + 9 * fraction)
+    return fraction
+
+
+class _Fade:
+    """One parameter moving from start to target."""
+
+    __slots__ = ("start", "target", "started_at", "duration", "curve", "sent")
+
+    def __init__(
+        self,
+        start: float,
+        target: int,
+        started_at: float,
+        duration: float,
+        curve: str,
+        sent: Optional[int],
+    ):
+        """Initialize the fade."""
+        self.start = start
+        self.target = target
+        self.started_at = started_at
+        self.duration = duration
+        self.curve = curve
+        self.sent = sent
+
+    def fraction(self, now: float) -> float:
+        """Return the part of the fade's duration that has passed."""
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, (now - self.started_at) / self.duration)
+
+    def value(self, fraction: float) -> int:
+        """Return the value the parameter should have at fraction."""
+        return round(self.start + (self.target - self.start) * _progress(self.curve, fraction))
+
+
+class FadeEngine:
+    """Runs gain fades for a device from a single ticker task.
+
+    Every tick the next value of every running fade is sent in one batched
+    set, so fading many channels costs no more messages than fading one.
+    """
+
+    def __init__(self, coordinator: AZMCoordinator, step_rate: float):
+        """Initialize the engine; step_rate is the number of ticks per second."""
+        self._coordinator = coordinator
+        self._interval = 1 / step_rate
+        self._fades: dict[str, _Fade] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def active(self) -> list[str]:
+        """Return the parameters currently fading."""
+        return list(self._fades)
+
+    def start(
+        self, params: Iterable[str], target: int, duration: float, curve: str = CURVE_LINEAR
+    ) -> int:
+        """Fade params from their current values to target over duration seconds.
+
+        A parameter that is already fading starts over from where it is.
+        Parameters the device has not reported a value for jump to target.
+        Returns the number of parameters faded.
+        """
+        coordinator = self._coordinator
+        now = coordinator.hass.loop.time()
+        count = 0
+        for param in params:
+            current = coordinator.get_value(param)
+            if current is None:
+                fade = _Fade(target, target, now, 0, curve, None)
+            else:
+                fade = _Fade(current, target, now, duration, curve, current)
+            self._fades[param] = fade
+            count += 1
+
+        if self._fades and self._task is None:
+            self._task = coordinator.hass.async_create_task(self._async_run())
+        _LOGGER.debug("Fading %d parameters to %d over %.1fs", count, target, duration)
+        return count
+
+    def cancel(self, params: Optional[Iterable[str]] = None) -> None:
+        """Stop fading params, or every parameter without any.
+
+        Stopped parameters keep the value they were last set to. The ticker
+        task ends by itself once nothing is left to fade.
+        """
+        if not self._fades:
+            return
+        if params is None:
+            self._fades.clear()
+            return
+        for param in params:
+            self._fades.pop(param, None)
+
+    async def async_stop(self) -> None:
+        """Stop all fades and wait for the ticker task to end."""
+        self._fades.clear()
+        task = self._task
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _async_run(self) -> None:
+        """Send the next step of every fade once per tick until all are done."""
+        coordinator = self._coordinator
+        loop = coordinator.hass.loop
+        next_tick = loop.time()
+        try:
+            while self._fades:
+                if not coordinator.connected:
+                    _LOGGER.debug("Connection lost, stopping %d fades", len(self._fades))
+                    self._fades.clear()
+                    break
+
+                now = loop.time()
+                changes = []
+                for param, fade in list(self._fades.items()):
+                    fraction = fade.fraction(now)
+                    value = fade.value(fraction)
+                    if value != fade.sent:
+                        fade.sent = value
+                        changes.append((param, value, "pct"))
+                    if fraction >= 1:
+                        del self._fades[param]
+                if changes:
+                    await coordinator.async_set_parameters(changes, cancel_fades=False)
+
+                # Skip ticks we fell behind on rather than sending them late
+                next_tick = max(next_tick + self._interval, loop.time())
+                await asyncio.sleep(next_tick - loop.time())
+        finally:
+            self._task = None
@@ -0,0 +1,117 @@
+"""Meter aggregation for AtlasIED AZM4/AZM8 UDP meter streams."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+
+class MeterReading(NamedTuple):
+    """Aggregated meter values for one channel."""
+
+    last: float
+    peak: float
+    average: float
+
+
+class _MeterChannel:
+    """Sample window and publish state for a single meter parameter."""
+
+    __slots__ = ("samples", "total", "last_publish", "timer", "dirty")
+
+    def __init__(self):
+        """Initialize an empty channel."""
+        self.samples: deque[tuple[float, float]] = deque()
+        self.total = 0.0
+        self.last_publish = float("-inf")
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.dirty = False
+
+
+class MeterAggregator:
+    """Collect meter samples and publish them at a bounded rate per channel.
+
+    Every sample is kept for `window` seconds so peak-hold and average can be
+    reported alongside the last value. A channel is published at most
+    `max_rate` times per second: the first sample after a quiet period is
+    published immediately and anything arriving inside the rate limit is
+    folded into a single trailing publish.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        publish_callback: Callable[[str, MeterReading], None],
+        window: float,
+        max_rate: float,
+    ):
+        """Initialize the aggregator."""
+        self._loop = loop
+        self._publish_callback = publish_callback
+        self._window = window
+        self._min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._channels: dict[str, _MeterChannel] = {}
+
+    def add_sample(self, param: str, value: float) -> None:
+        """Record a meter sample and publish it if the channel is due."""
+        now = self._loop.time()
+        channel = self._channels.get(param)
+        if channel is None:
+            channel = self._channels[param] = _MeterChannel()
+
+        channel.samples.append((now, value))
+        channel.total += value
+        self._expire(channel, now)
+        channel.dirty = True
+
+        if channel.timer is not None:
+            return
+
+        delay = channel.last_publish + self._min_interval - now
+        if delay <= 0:
+            self._publish(param, channel, now)
+        else:
+            channel.timer = self._loop.call_later(delay, self._publish_due, param)
+
+    def remove(self, param: str) -> None:
+        """Forget a channel and any publish pending for it."""
+        channel = self._channels.pop(param, None)
+        if channel is not None and channel.timer is not None:
+            channel.timer.cancel()
+
+    def close(self) -> None:
+        """Cancel all pending publishes."""
+        for channel in self._channels.values():
+            if channel.timer is not None:
+                channel.timer.cancel()
+        self._channels.clear()
+
+    def _expire(self, channel: _MeterChannel, now: float) -> None:
+        """Drop samples older than the window, keeping the latest one."""
+        cutoff = now - self._window
+        samples = channel.samples
+        while len(samples) > 1 and samples[0][0] < cutoff:
+            channel.total -= samples.popleft()[1]
+
+    def _publish_due(self, param: str) -> None:
+        """Publish a channel whose rate limit has elapsed."""
+        channel = self._channels.get(param)
+        if channel is None:
+            return
+        channel.timer = None
+        if channel.dirty:
+            now = self._loop.time()
+            self._expire(channel, now)
+            self._publish(param, channel, now)
+
+    def _publish(self, param: str, channel: _MeterChannel, now: float) -> None:
+        """Hand the aggregated reading for a channel to the callback."""
+        samples = channel.samples
+        reading = MeterReading(
+            last=samples[-1][1],
+            peak=max(value for _, value in samples),
+            average=channel.total / len(samples),
+        )
+        channel.dirty = False
+        channel.last_publish = now
+        self._publish_callback(param, reading)
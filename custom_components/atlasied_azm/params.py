@@ -0,0 +1,150 @@
+"""Indexed parameter storage for AtlasIED AZM4/AZM8 devices."""
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from typing import Any, NamedTuple, Optional
+
+# Numeric parameter families and the channel count that sizes them
+ZONE_FAMILIES = ("ZoneGain", "ZoneMute", "ZoneMeter")
+SOURCE_FAMILIES = ("SourceGain", "SourceMute", "SourceMeter")
+GROUP_FAMILIES = ("GroupActive",)
+METER_FAMILIES = ("ZoneMeter", "SourceMeter")
+
+# Text parameter families
+TEXT_FAMILIES = {"ZoneName": "zones", "SourceName": "sources"}
+
+_NAN = float("nan")
+
+
+class ParamKey(NamedTuple):
+    """A device parameter split into its family and channel index."""
+
+    family: str
+    index: int
+
+
+_KEYS: dict[str, Optional[ParamKey]] = {}
+
+
+def parse_param(param: str) -> Optional[ParamKey]:
+    """Return the interned key for a parameter name like "ZoneGain_3".
+
+    Names are parsed once and cached; parameters without a channel index
+    (such as "KeepAlive") map to None.
+    """
+    try:
+        return _KEYS[param]
+    except KeyError:
+        pass
+
+    family, sep, index = param.rpartition("_")
+    key = ParamKey(sys.intern(family), int(index)) if sep and index.isdigit() else None
+    _KEYS[sys.intern(param)] = key
+    return key
+
+
+def _from_float(value: float) -> Any:
+    """Convert a stored column value back to what the device reported."""
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+class ParameterStore:
+    """Parameter values kept in per-family columns.
+
+    Numeric families are preallocated float arrays indexed by channel, with
+    NaN marking values the device has not reported yet. Name families are
+    lists of strings. Anything else falls back to a plain dict.
+    """
+
+    def __init__(self, num_zones: int, num_sources: int, num_groups: int):
+        """Initialize empty columns for the configured channel counts."""
+        sizes = {"zones": num_zones, "sources": num_sources, "groups": num_groups}
+        self._columns: dict[str, array] = {}
+        for families, size in (
+            (ZONE_FAMILIES, num_zones),
+            (SOURCE_FAMILIES, num_sources),
+            (GROUP_FAMILIES, num_groups),
+        ):
+            for family in families:
+                self._columns[family] = array("d", [_NAN]) * size
+        self._text: dict[str, list[Optional[str]]] = {
+            family: [None] * sizes[kind] for family, kind in TEXT_FAMILIES.items()
+        }
+        self._other: dict[str, Any] = {}
+
+    def get(self, param: str) -> Any:
+        """Return the stored value of a parameter, or None if unknown."""
+        key = parse_param(param)
+        if key is not None:
+            column = self._columns.get(key.family)
+            if column is not None and key.index < len(column):
+                return _from_float(column[key.index])
+            text = self._text.get(key.family)
+            if text is not None and key.index < len(text):
+                return text[key.index]
+        return self._other.get(param)
+
+    def set(self, param: str, value: Any) -> bool:
+        """Store a parameter value and return True if it changed.
+
+        None marks the value as not reported by the device.
+        """
+        key = parse_param(param)
+        if key is not None:
+            column = self._columns.get(key.family)
+            if column is not None and key.index < len(column):
+                try:
+                    number = _NAN if value is None else float(value)
+                except (TypeError, ValueError):
+                    pass
+                else:
+                    current = column[key.index]
+                    if current == number or (value is None and math.isnan(current)):
+                        return False
+                    column[key.index] = number
+                    return True
+            text = self._text.get(key.family)
+            if text is not None and key.index < len(text):
+                if text[key.index] == value:
+                    return False
+                text[key.index] = value
+                return True
+
+        if param in self._other and self._other[param] == value:
+            return False
+        self._other[param] = value
+        return True
+
+    def dump(self, skip: tuple[str, ...] = ()) -> dict[str, Any]:
+        """Return every known channel value by parameter name.
+
+        Families listed in skip are left out.
+        """
+        values: dict[str, Any] = {}
+        for family, column in self._columns.items():
+            if family in skip:
+                continue
+            for index, value in enumerate(column):
+                if not math.isnan(value):
+                    values[f"{family}_{index}"] = _from_float(value)
+        for family, text in self._text.items():
+            if family in skip:
+                continue
+            for index, value in enumerate(text):
+                if value is not None:
+                    values[f"{family}_{index}"] = value
+        return values
+
+    def snapshot(self, family: str) -> list[Any]:
+        """Return every channel's value of a family, indexed by channel."""
+        column = self._columns.get(family)
+        if column is not None:
+            return [_from_float(value) for value in column]
+        text = self._text.get(family)
+        if text is not None:
+            return list(text)
+        return []
@@ -0,0 +1,96 @@
+"""Mixer scene snapshots for the AtlasIED AZM4/AZM8 integration."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import AZMCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Parameter families captured in a scene and the format they are set with
+SCENE_FAMILIES = {
+    "ZoneGain": "pct",
+    "ZoneMute": "val",
+    "SourceGain": "pct",
+    "SourceMute": "val",
+    "GroupActive": "val",
+}
+
+
+def _scene_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding a config entry's scenes."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.scenes")
+
+
+async def async_remove_scenes(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete a config entry's saved scenes."""
+    await _scene_store(hass, entry_id).async_remove()
+
+
+class SceneManager:
+    """Named snapshots of a device's gains, mutes and groups."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: AZMCoordinator, entry_id: str):
+        """Initialize the scene manager."""
+        self._coordinator = coordinator
+        self._store = _scene_store(hass, entry_id)
+        self._scenes: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load saved scenes from storage."""
+        data = await self._store.async_load()
+        if data:
+            self._scenes = data.get("scenes", {})
+
+    @property
+    def names(self) -> list[str]:
+        """Return the names of the saved scenes."""
+        return list(self._scenes)
+
+    async def async_save_scene(self, name: str) -> int:
+        """Capture the current mixer state as a scene.
+
+        Only values the device has reported are captured. Returns the number
+        of parameters saved.
+        """
+        scene = {}
+        for family in SCENE_FAMILIES:
+            for index, value in enumerate(self._coordinator.get_family(family)):
+                if value is not None:
+                    scene[f"{family}_{index}"] = value
+        self._scenes[name] = scene
+        await self._store.async_save({"scenes": self._scenes})
+        _LOGGER.debug("Saved scene %s with %d parameters", name, len(scene))
+        return len(scene)
+
+    async def async_recall_scene(self, name: str) -> bool:
+        """Restore a scene, sending only the parameters that differ.
+
+        All changes go out as batched set messages. Returns False if they
+        could not be sent. Raises KeyError for an unknown scene.
+        """
+        scene = self._scenes[name]
+        changes = []
+        for param, value in scene.items():
+            if self._coordinator.get_value(param) != value:
+                family = param.rpartition("_")[0]
+                changes.append((param, value, SCENE_FAMILIES.get(family, "val")))
+        if changes and not await self._coordinator.async_set_parameters(changes):
+            return False
+        _LOGGER.debug("Recalled scene %s: %d of %d parameters changed",
+                      name, len(changes), len(scene))
+        return True
+
+    async def async_delete_scene(self, name: str) -> None:
+        """Delete a saved scene. Raises KeyError for an unknown scene."""
+        del self._scenes[name]
+        await self._store.async_save({"scenes": self._scenes})
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Any, Callable, Optional
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -44,9 +45,45 @@ async def async_setup_entry(
     for i in range(num_sources):
         entities.append(AZMSourceMeter(coordinator, i))
     
+    # Link diagnostics (disabled by default)
+    entities.append(AZMLinkSensor(
+        coordinator, "rtt", "Link Round Trip Time", _rtt_ms,
+        unit=UnitOfTime.MILLISECONDS,
+    ))
+    entities.append(AZMLinkSensor(
+        coordinator, "messages_in", "TCP Messages Received",
+        lambda c: sum(c.client.stats.messages_in.values()),
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ))
+    entities.append(AZMLinkSensor(
+        coordinator, "messages_out", "TCP Messages Sent",
+        lambda c: sum(c.client.stats.messages_out.values()),
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ))
+    entities.append(AZMLinkSensor(
+        coordinator, "udp_datagrams", "UDP Datagrams Received",
+        lambda c: c.client.stats.udp_datagrams,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ))
+    entities.append(AZMLinkSensor(
+        coordinator, "queue_depth", "Outbound Queue Peak Depth",
+        lambda c: c.client.stats.queue_depth_max,
+    ))
+    entities.append(AZMLinkSensor(
+        coordinator, "throttled", "Messages Throttled",
+        lambda c: c.client.stats.throttled,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ))
+    
     async_add_entities(entities)
 
 
+def _rtt_ms(coordinator: AZMCoordinator) -> float | None:
+    """Return the last measured round-trip time in milliseconds."""
+    rtt = coordinator.client.last_rtt
+    return round(rtt * 1000, 1) if rtt is not None else None
+
+
 class AZMSensorEntity(SensorEntity):
     """Base class for AZM sensor entities."""
 
@@ -59,33 +96,38 @@ class AZMSensorEntity(SensorEntity):
         self._static_name = name
         self._attr_unique_id = f"{coordinator.host}_{param}"
         self._attr_should_poll = False
+        # Whether the entity keeps its parameter subscribed on the device
+        self._holds_subscription = True
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to parameter updates when added to hass."""
-        await self._coordinator.subscribe_device_parameter(self._param, self._fmt)
         self._coordinator.subscribe_parameter(self._param, self._handle_update)
-        await self._coordinator.get_parameter(self._param, self._fmt)
+        if self._holds_subscription:
+            self._coordinator.register_parameter(self._param, self._fmt)
         
         # Subscribe to name parameter if provided
         if self._name_param:
-            await self._coordinator.subscribe_device_parameter(self._name_param, "str")
-            self._coordinator.subscribe_parameter(self._name_param, self._handle_name_update)
-            await self._coordinator.get_parameter(self._name_param, "str")
+            self._coordinator.subscribe_parameter(self._name_param, self._handle_update)
+            self._coordinator.register_parameter(self._name_param, "str")
 
     async def async_will_remove_from_hass(self) -> None:
         """Unsubscribe when removed from hass."""
         self._coordinator.unsubscribe_parameter(self._param, self._handle_update)
+        if self._holds_subscription:
+            self._coordinator.unregister_parameter(self._param, self._fmt)
         if self._name_param:
-            self._coordinator.unsubscribe_parameter(self._name_param, self._handle_name_update)
+            self._coordinator.unsubscribe_parameter(self._name_param, self._handle_update)
+            self._coordinator.unregister_parameter(self._name_param, "str")
 
     def _handle_update(self) -> None:
-        """Handle updates from the coordinator."""
-        self.async_write_ha_state()
-    
-    def _handle_name_update(self) -> None:
-        """Handle name updates from the coordinator."""
+        """Handle value and name updates from the coordinator."""
         self.async_write_ha_state()
     
+    @property
+    def available(self) -> bool:
+        """Return True if the device is reachable."""
+        return self._coordinator.connected
+
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -121,7 +163,35 @@ class AZMSourceName(AZMSensorEntity):
         super().__init__(coordinator, param, name, fmt="str")
 
 
-class AZMZoneMeter(AZMSensorEntity):
+class AZMMeterSensor(AZMSensorEntity):
+    """Base class for meter sensors with peak-hold and average attributes.
+
+    In on-demand mode the meter is only streamed during live metering
+    windows, and the sensor is unavailable outside them.
+    """
+
+    def __init__(self, coordinator: AZMCoordinator, param: str, name: str, name_param: str):
+        """Initialize the meter sensor."""
+        super().__init__(coordinator, param, name, fmt="val", name_param=name_param)
+        self._holds_subscription = not coordinator.meter_on_demand
+        self._attr_native_unit_of_measurement = "dB"
+        self._attr_device_class = None
+
+    @property
+    def available(self) -> bool:
+        """Return True while the device is streaming this meter."""
+        return self._coordinator.connected and self._coordinator.is_registered(self._param)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the aggregated meter values."""
+        reading = self._coordinator.get_meter_reading(self._param)
+        if reading is None:
+            return None
+        return {"peak": reading.peak, "average": round(reading.average, 1)}
+
+
+class AZMZoneMeter(AZMMeterSensor):
     """Zone meter sensor (audio level)."""
 
     def __init__(self, coordinator: AZMCoordinator, zone_idx: int):
@@ -129,13 +199,10 @@ class AZMZoneMeter(AZMSensorEntity):
         param = f"ZoneMeter_{zone_idx}"
         name_param = f"ZoneName_{zone_idx}"
         name = f"Zone {zone_idx + 1} Meter"
-        super().__init__(coordinator, param, name, fmt="val", name_param=name_param)
-        
-        self._attr_native_unit_of_measurement = "dB"
-        self._attr_device_class = None
+        super().__init__(coordinator, param, name, name_param)
 
 
-class AZMSourceMeter(AZMSensorEntity):
+class AZMSourceMeter(AZMMeterSensor):
     """Source meter sensor (audio level)."""
 
     def __init__(self, coordinator: AZMCoordinator, source_idx: int):
@@ -143,7 +210,35 @@ class AZMSourceMeter(AZMSensorEntity):
         param = f"SourceMeter_{source_idx}"
         name_param = f"SourceName_{source_idx}"
         name = f"Source {source_idx + 1} Meter"
-        super().__init__(coordinator, param, name, fmt="val", name_param=name_param)
-        
-        self._attr_native_unit_of_measurement = "dB"
-        self._attr_device_class = None
+        super().__init__(coordinator, param, name, name_param)
+
+
+class AZMLinkSensor(SensorEntity):
+    """Diagnostic sensor reporting statistics about the device link."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: AZMCoordinator,
+        key: str,
+        name: str,
+        value_fn: Callable[[AZMCoordinator], Any],
+        unit: str | None = None,
+        state_class: SensorStateClass = SensorStateClass.MEASUREMENT,
+    ):
+        """Initialize the link sensor."""
+        self._coordinator = coordinator
+        self._value_fn = value_fn
+        self._attr_unique_id = f"{coordinator.host}_link_{key}"
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        # Counters change constantly; poll instead of pushing every change
+        self._attr_should_poll = True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value."""
+        return self._value_fn(self._coordinator)
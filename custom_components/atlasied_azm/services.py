@@ -0,0 +1,312 @@
+"""Services for the AtlasIED AZM4/AZM8 integration."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers.event import async_call_later
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .const import DEFAULT_FADE_DURATION, DEFAULT_LIVE_METERING_DURATION, DOMAIN
+from .fade import CURVE_LINEAR, CURVES
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_NAME = "name"
+ATTR_ZONES = "zones"
+ATTR_SOURCES = "sources"
+ATTR_PARAMETER = "parameter"
+ATTR_VALUE = "value"
+ATTR_DURATION = "duration"
+ATTR_TARGET = "target"
+ATTR_CURVE = "curve"
+
+ALL_CHANNELS = "all"
+
+SERVICE_SAVE_SCENE = "save_scene"
+SERVICE_RECALL_SCENE = "recall_scene"
+SERVICE_DELETE_SCENE = "delete_scene"
+SERVICE_BULK_SET = "bulk_set"
+SERVICE_LIVE_METERING = "live_metering"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_FADE = "fade"
+SERVICE_STOP_FADE = "stop_fade"
+
+SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+def _channels(value: Any) -> str | list[int]:
+    """Validate a channel selection.
+
+    Accepts "all", a list of channel numbers, or a comma separated string of
+    numbers and ranges such as "1-4, 7". Channel numbers start at 1.
+    """
+    if isinstance(value, str) and value.strip().lower() == ALL_CHANNELS:
+        return ALL_CHANNELS
+    channels: list[int] = []
+    for item in cv.ensure_list_csv(value):
+        first, sep, last = str(item).partition("-")
+        try:
+            start = int(first)
+            end = int(last) if sep else start
+        except ValueError as err:
+            raise vol.Invalid(f"Invalid channel selection: {item}") from err
+        if start < 1 or end < start:
+            raise vol.Invalid(f"Invalid channel range: {item}")
+        channels.extend(range(start, end + 1))
+    return channels
+
+
+def _bulk_value(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert the value to what the device expects for the parameter."""
+    if data[ATTR_PARAMETER] == "mute":
+        data[ATTR_VALUE] = int(cv.boolean(data[ATTR_VALUE]))
+    else:
+        data[ATTR_VALUE] = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))(
+            data[ATTR_VALUE]
+        )
+    return data
+
+
+BULK_SET_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ZONES): _channels,
+            vol.Optional(ATTR_SOURCES): _channels,
+            vol.Required(ATTR_PARAMETER): vol.In(["gain", "mute"]),
+            vol.Required(ATTR_VALUE): cv.match_all,
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ZONES, ATTR_SOURCES),
+    _bulk_value,
+)
+
+LIVE_METERING_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ZONES): _channels,
+            vol.Optional(ATTR_SOURCES): _channels,
+            vol.Optional(ATTR_DURATION, default=DEFAULT_LIVE_METERING_DURATION): vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=3600)
+            ),
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ZONES, ATTR_SOURCES),
+)
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=1, max=86400)),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+STOP_CAPTURE_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+FADE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ZONES): _channels,
+            vol.Optional(ATTR_SOURCES): _channels,
+            vol.Required(ATTR_TARGET): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional(ATTR_DURATION, default=DEFAULT_FADE_DURATION): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=3600)
+            ),
+            vol.Optional(ATTR_CURVE, default=CURVE_LINEAR): vol.In(CURVES),
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ZONES, ATTR_SOURCES),
+)
+
+STOP_FADE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ZONES): _channels,
+        vol.Optional(ATTR_SOURCES): _channels,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+def _select(selection: str | list[int] | None, count: int) -> list[int]:
+    """Return the zero-based channel indexes a selection covers on a device."""
+    if selection is None:
+        return []
+    if selection == ALL_CHANNELS:
+        return list(range(count))
+    return [channel - 1 for channel in selection if channel <= count]
+
+
+def _gain_params(call: ServiceCall, coordinator) -> list[str]:
+    """Return the gain parameters of the zones and sources a call selects."""
+    return [
+        f"ZoneGain_{index}"
+        for index in _select(call.data.get(ATTR_ZONES), coordinator.num_zones)
+    ] + [
+        f"SourceGain_{index}"
+        for index in _select(call.data.get(ATTR_SOURCES), coordinator.num_sources)
+    ]
+
+
+def _coordinators(hass: HomeAssistant, call: ServiceCall) -> list:
+    """Return the coordinators a service call targets.
+
+    Without a config entry id the call applies to every configured device.
+    """
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None:
+        return list(coordinators.values())
+    if entry_id not in coordinators:
+        raise HomeAssistantError(f"No loaded AZM device with config entry {entry_id}")
+    return [coordinators[entry_id]]
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_SAVE_SCENE):
+        return
+
+    async def async_save_scene(call: ServiceCall) -> None:
+        """Capture the current mixer state as a named scene."""
+        for coordinator in _coordinators(hass, call):
+            await coordinator.scenes.async_save_scene(call.data[ATTR_NAME])
+
+    async def async_recall_scene(call: ServiceCall) -> None:
+        """Restore a named scene."""
+        name = call.data[ATTR_NAME]
+        for coordinator in _coordinators(hass, call):
+            try:
+                recalled = await coordinator.scenes.async_recall_scene(name)
+            except KeyError as err:
+                raise HomeAssistantError(
+                    f"Scene {name} is not saved for {coordinator.host}"
+                ) from err
+            if not recalled:
+                raise HomeAssistantError(
+                    f"Failed to send scene {name} to {coordinator.host}"
+                )
+
+    async def async_delete_scene(call: ServiceCall) -> None:
+        """Delete a named scene."""
+        name = call.data[ATTR_NAME]
+        for coordinator in _coordinators(hass, call):
+            try:
+                await coordinator.scenes.async_delete_scene(name)
+            except KeyError:
+                _LOGGER.debug("Scene %s is not saved for %s", name, coordinator.host)
+
+    async def async_bulk_set(call: ServiceCall) -> None:
+        """Set one parameter on many zones and sources in a single message."""
+        kind = "Gain" if call.data[ATTR_PARAMETER] == "gain" else "Mute"
+        fmt = "pct" if kind == "Gain" else "val"
+        value = call.data[ATTR_VALUE]
+        for coordinator in _coordinators(hass, call):
+            values = [
+                (f"Zone{kind}_{index}", value, fmt)
+                for index in _select(call.data.get(ATTR_ZONES), coordinator.num_zones)
+            ] + [
+                (f"Source{kind}_{index}", value, fmt)
+                for index in _select(call.data.get(ATTR_SOURCES), coordinator.num_sources)
+            ]
+            if values and not await coordinator.async_set_parameters(values):
+                raise HomeAssistantError(f"Failed to send bulk set to {coordinator.host}")
+
+    async def async_live_metering(call: ServiceCall) -> None:
+        """Stream the selected meters for a while."""
+        for coordinator in _coordinators(hass, call):
+            params = [
+                f"ZoneMeter_{index}"
+                for index in _select(call.data.get(ATTR_ZONES), coordinator.num_zones)
+            ] + [
+                f"SourceMeter_{index}"
+                for index in _select(call.data.get(ATTR_SOURCES), coordinator.num_sources)
+            ]
+            coordinator.request_meters(params, call.data[ATTR_DURATION])
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Record device traffic to a capture file under the config directory."""
+        stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+        for coordinator in _coordinators(hass, call):
+            path = hass.config.path(
+                DOMAIN, "captures", f"{coordinator.host}-{stamp}.azmcap"
+            )
+            await coordinator.async_start_capture(path)
+            if ATTR_DURATION in call.data:
+                capture = coordinator.client.capture
+
+                async def async_stop(_now, coordinator=coordinator, capture=capture):
+                    """Stop the capture unless another one replaced it."""
+                    if coordinator.client.capture is capture:
+                        await coordinator.async_stop_capture()
+
+                async_call_later(hass, call.data[ATTR_DURATION], async_stop)
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        """Stop recording device traffic."""
+        for coordinator in _coordinators(hass, call):
+            await coordinator.async_stop_capture()
+
+    async def async_fade(call: ServiceCall) -> None:
+        """Fade the selected gains to a target level."""
+        for coordinator in _coordinators(hass, call):
+            coordinator.fades.start(
+                _gain_params(call, coordinator),
+                call.data[ATTR_TARGET],
+                call.data[ATTR_DURATION],
+                call.data[ATTR_CURVE],
+            )
+
+    async def async_stop_fade(call: ServiceCall) -> None:
+        """Stop fades, leaving the gains where they are."""
+        selected = ATTR_ZONES in call.data or ATTR_SOURCES in call.data
+        for coordinator in _coordinators(hass, call):
+            coordinator.fades.cancel(_gain_params(call, coordinator) if selected else None)
+
+    hass.services.async_register(DOMAIN, SERVICE_SAVE_SCENE, async_save_scene, SCENE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RECALL_SCENE, async_recall_scene, SCENE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_DELETE_SCENE, async_delete_scene, SCENE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_BULK_SET, async_bulk_set, BULK_SET_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_LIVE_METERING, async_live_metering, LIVE_METERING_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_CAPTURE, async_start_capture, START_CAPTURE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture, STOP_CAPTURE_SCHEMA
+    )
+    hass.services.async_register(DOMAIN, SERVICE_FADE, async_fade, FADE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_FADE, async_stop_fade, STOP_FADE_SCHEMA)
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration's services once no device is loaded."""
+    if hass.data.get(DOMAIN):
+        return
+    for service in (
+        SERVICE_SAVE_SCENE,
+        SERVICE_RECALL_SCENE,
+        SERVICE_DELETE_SCENE,
+        SERVICE_BULK_SET,
+        SERVICE_LIVE_METERING,
+        SERVICE_START_CAPTURE,
+        SERVICE_STOP_CAPTURE,
+        SERVICE_FADE,
+        SERVICE_STOP_FADE,
+    ):
+        hass.services.async_remove(DOMAIN, service)
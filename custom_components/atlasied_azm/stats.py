@@ -0,0 +1,128 @@
+"""Runtime counters and histograms for the AtlasIED AZM link."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any
+
+# Upper bucket bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with constant-time recording."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record one observation in seconds."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which fraction of samples fall."""
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary in milliseconds."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LinkStats:
+    """Traffic counters kept by AZMClient."""
+
+    def __init__(self):
+        """Initialize all counters at zero."""
+        self.messages_in: Counter[str] = Counter()
+        self.messages_out: Counter[str] = Counter()
+        self.udp_datagrams = 0
+        self.json_errors = 0
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+        self.reconnects = 0
+        self.heartbeats = 0
+        self.heartbeat_misses = 0
+        self.dead_links = 0
+        self.meter_drops = 0
+        self.ingest_batches = 0
+        self.ingest_backlog_max = 0
+        self.superseded = 0
+        self.throttled = 0
+        self.drain_wait = Histogram()
+        self.interactive_wait = Histogram()
+        self.get_rtt = Histogram()
+        self.throttle_wait = Histogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "messages_in": dict(self.messages_in),
+            "messages_out": dict(self.messages_out),
+            "udp_datagrams": self.udp_datagrams,
+            "json_errors": self.json_errors,
+            "queue_depth": self.queue_depth,
+            "queue_depth_max": self.queue_depth_max,
+            "reconnects": self.reconnects,
+            "heartbeats": self.heartbeats,
+            "heartbeat_misses": self.heartbeat_misses,
+            "dead_links": self.dead_links,
+            "meter_drops": self.meter_drops,
+            "ingest_batches": self.ingest_batches,
+            "ingest_backlog_max": self.ingest_backlog_max,
+            "superseded": self.superseded,
+            "throttled": self.throttled,
+            "drain_wait": self.drain_wait.as_dict(),
+            "interactive_wait": self.interactive_wait.as_dict(),
+            "get_rtt": self.get_rtt.as_dict(),
+            "throttle_wait": self.throttle_wait.as_dict(),
+        }
+
+
+class CoordinatorStats:
+    """Update and dispatch counters kept by AZMCoordinator."""
+
+    def __init__(self):
+        """Initialize all counters at zero."""
+        self.updates = 0
+        self.unchanged_updates = 0
+        self.meter_samples = 0
+        self.listener_calls = 0
+        self.dispatch_time = Histogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "updates": self.updates,
+            "unchanged_updates": self.unchanged_updates,
+            "meter_samples": self.meter_samples,
+            "listener_calls": self.listener_calls,
+            "dispatch_time": self.dispatch_time.as_dict(),
+        }
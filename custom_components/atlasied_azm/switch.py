@@ -58,30 +58,31 @@ class AZMSwitchEntity(SwitchEntity):
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to parameter updates when added to hass."""
-        await self._coordinator.subscribe_device_parameter(self._param, "val")
         self._coordinator.subscribe_parameter(self._param, self._handle_update)
-        await self._coordinator.get_parameter(self._param, "val")
+        self._coordinator.register_parameter(self._param, "val")
         
         # Subscribe to name parameter if provided
         if self._name_param:
-            await self._coordinator.subscribe_device_parameter(self._name_param, "str")
-            self._coordinator.subscribe_parameter(self._name_param, self._handle_name_update)
-            await self._coordinator.get_parameter(self._name_param, "str")
+            self._coordinator.subscribe_parameter(self._name_param, self._handle_update)
+            self._coordinator.register_parameter(self._name_param, "str")
 
     async def async_will_remove_from_hass(self) -> None:
         """Unsubscribe when removed from hass."""
         self._coordinator.unsubscribe_parameter(self._param, self._handle_update)
+        self._coordinator.unregister_parameter(self._param, "val")
         if self._name_param:
-            self._coordinator.unsubscribe_parameter(self._name_param, self._handle_name_update)
+            self._coordinator.unsubscribe_parameter(self._name_param, self._handle_update)
+            self._coordinator.unregister_parameter(self._name_param, "str")
 
     def _handle_update(self) -> None:
-        """Handle updates from the coordinator."""
-        self.async_write_ha_state()
-    
-    def _handle_name_update(self) -> None:
-        """Handle name updates from the coordinator."""
+        """Handle value and name updates from the coordinator."""
         self.async_write_ha_state()
     
+    @property
+    def available(self) -> bool:
+        """Return True if the device is reachable."""
+        return self._coordinator.connected
+
     @property
     def name(self) -> str:
         """Return the name of the entity."""
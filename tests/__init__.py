@@ -0,0 +1 @@
+"""Tests for the AtlasIED AZM4/AZM8 integration."""
@@ -0,0 +1,49 @@
+"""Shared fixtures for the AtlasIED AZM tests.
+
+The client and unit tests need only pytest and import the integration's
+Home Assistant independent modules as the "atlasied_azm" package. The
+coordinator and platform tests also need pytest-homeassistant-custom-component
+and are skipped without it.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import sys
+
+import pytest
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+
+import azm_package  # noqa: E402
+
+azm_package.install()
+
+try:
+    import pytest_socket
+except ImportError:
+    pytest_socket = None
+
+# Simulated devices listen on these so each one has its own address
+LOOPBACK_HOSTS = ["127.0.0.1", "127.0.0.2"]
+
+
+@pytest.fixture(autouse=True)
+def _loopback_sockets():
+    """Allow sockets to the simulated devices.
+
+    pytest-homeassistant-custom-component blocks every socket during tests;
+    the simulators are real servers on loopback addresses.
+    """
+    if pytest_socket is not None:
+        pytest_socket.enable_socket()
+        pytest_socket.socket_allow_hosts(LOOPBACK_HOSTS)
+
+
+@pytest.fixture
+def udp_port() -> int:
+    """Return a UDP port nothing is listening on, for meter datagrams."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("0.0.0.0", 0))
+        return sock.getsockname()[1]
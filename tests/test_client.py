@@ -0,0 +1,225 @@
+"""Tests running AZMClient against the simulated device."""
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import pytest
+
+from atlasied_azm import azm_client
+from azm_simulator import AZMSimulator
+
+TIMEOUT = 5.0
+
+
+async def _wait_for(condition) -> None:
+    """Wait until condition() is true."""
+    async with asyncio.timeout(TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def _fast_link(monkeypatch, udp_port):
+    """Use a private UDP port and reconnect without the usual backoff."""
+    monkeypatch.setattr(azm_client, "UDP_PORT", udp_port)
+    monkeypatch.setattr(azm_client, "RECONNECT_MIN_DELAY", 0.05)
+
+
+def _simulator(host: str = "127.0.0.1", meter_rate: float = 0.0) -> AZMSimulator:
+    """Return a simulator on an ephemeral port sending meters to our UDP port."""
+    return AZMSimulator(
+        host, port=0, zones=2, sources=1, groups=1,
+        meter_rate=meter_rate, udp_port=azm_client.UDP_PORT,
+    )
+
+
+def _client(simulator: AZMSimulator, **kwargs) -> azm_client.AZMClient:
+    """Return a client for a simulator."""
+    return azm_client.AZMClient(
+        simulator.host, port=simulator.port, heartbeat_interval=0, **kwargs
+    )
+
+
+def test_get_values_and_errors():
+    """get returns the device's values and raises on an error reply."""
+
+    async def run():
+        simulator = _simulator()
+        await simulator.start()
+        client = _client(simulator)
+        try:
+            assert await client.connect(meters=False)
+            assert await client.get("ZoneName_1", "str") == "Zone 2"
+            assert await client.get("ZoneGain_0", "pct") == 75
+            assert await client.send_set("ZoneGain_0", 50, "pct")
+            assert await client.get("ZoneGain_0", "pct") == 50
+            with pytest.raises(azm_client.AZMError):
+                await client.get("NoSuchParam_0")
+            assert client.last_rtt is not None
+        finally:
+            await client.disconnect()
+            await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_reconnect_replays_subscriptions():
+    """After the device drops the connection, subscriptions are restored."""
+
+    async def run():
+        updates = []
+        states = []
+        simulator = _simulator()
+        await simulator.start()
+        client = _client(
+            simulator,
+            update_callback=updates.append,
+            connection_callback=states.append,
+        )
+        try:
+            assert await client.connect(meters=False)
+            assert await client.subscribe("ZoneMute_1")
+            await _wait_for(lambda: simulator.messages_in >= 1)
+
+            simulator.drop_connections()
+            await _wait_for(lambda: states == [False, True])
+
+            updates.clear()
+            assert await client.send_set("ZoneMute_1", 1)
+            await _wait_for(lambda: {"param": "ZoneMute_1", "val": 1} in updates)
+            assert client.stats.reconnects == 1
+        finally:
+            await client.disconnect()
+            await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_reconnect_retries_when_the_device_drops_it():
+    """A reconnect the device resets straight away is retried."""
+
+    async def run():
+        states = []
+        simulator = _simulator()
+        await simulator.start()
+        client = _client(simulator, connection_callback=states.append)
+        try:
+            assert await client.connect(meters=False)
+            assert await client.subscribe("ZoneMute_1")
+
+            simulator.reset_connections = 2
+            simulator.drop_connections()
+            await _wait_for(lambda: states == [False, True])
+            assert client.connected
+            assert client.stats.reconnects == 1
+            assert await client.get("ZoneMute_1") == 0
+        finally:
+            await client.disconnect()
+            await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_meters_are_routed_by_device_address():
+    """Each client only receives the meter datagrams of its own device."""
+
+    async def run():
+        simulators = [_simulator(host, meter_rate=50) for host in ("127.0.0.1", "127.0.0.2")]
+        meters: list[list[dict]] = [[], []]
+        clients = []
+        try:
+            for simulator, received in zip(simulators, meters):
+                await simulator.start()
+                client = _client(simulator, meter_callback=received.append)
+                clients.append(client)
+                assert await client.connect()
+            assert await clients[0].subscribe("ZoneMeter_0")
+            assert await clients[1].subscribe("SourceMeter_0")
+
+            await _wait_for(lambda: len(meters[0]) >= 3 and len(meters[1]) >= 3)
+            assert {item["param"] for item in meters[0]} == {"ZoneMeter_0"}
+            assert {item["param"] for item in meters[1]} == {"SourceMeter_0"}
+        finally:
+            for client in clients:
+                await client.disconnect()
+            for simulator in simulators:
+                await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_connects_without_meters_when_the_udp_port_is_taken():
+    """A busy meter port does not stop the control connection."""
+
+    async def run():
+        simulator = _simulator()
+        await simulator.start()
+        client = _client(simulator)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as busy:
+            busy.bind(("0.0.0.0", azm_client.UDP_PORT))
+            try:
+                assert await client.connect()
+                assert await client.get("ZoneName_0", "str") == "Zone 1"
+            finally:
+                await client.disconnect()
+                await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_batched_sets_share_one_write():
+    """Every chunk of a large batched set goes out in the same write."""
+
+    async def run():
+        simulator = AZMSimulator(
+            port=0, zones=16, sources=16, groups=8, meter_rate=0,
+            udp_port=azm_client.UDP_PORT,
+        )
+        await simulator.start()
+        client = _client(simulator)
+        try:
+            assert await client.connect(meters=False)
+            values = [(f"ZoneMute_{i}", 1, "val") for i in range(16)]
+            values += [(f"SourceMute_{i}", 1, "val") for i in range(16)]
+            values += [(f"GroupActive_{i}", 1, "val") for i in range(8)]
+            values += [(f"ZoneGain_{i}", 50, "pct") for i in range(16)]
+            values += [(f"SourceGain_{i}", 50, "pct") for i in range(16)]
+            writes = client.stats.drain_wait.count
+            assert await client.set_multiple(values)
+            assert client.stats.drain_wait.count == writes + 1
+            assert client.stats.messages_out["set"] == 2
+            assert await client.get("SourceGain_15", "pct") == 50
+        finally:
+            await client.disconnect()
+            await simulator.stop()
+
+    asyncio.run(run())
+
+
+def test_queued_sets_coalesce_without_reordering_bumps():
+    """A newer set replaces a queued one, but never jumps over a bump."""
+
+    async def run():
+        simulator = _simulator()
+        await simulator.start()
+        client = _client(simulator, send_rate=5, send_burst=1)
+        try:
+            assert await client.connect(meters=False)
+            # Spend the burst so everything below waits in the outbox
+            assert await client.send_get("KeepAlive", "str")
+            assert all(await asyncio.gather(
+                client.send_set("ZoneGain_0", 10, "pct"),
+                client.send_bump("ZoneGain_0", 5, "pct"),
+                client.send_set("ZoneGain_0", 20, "pct"),
+                client.send_set("ZoneGain_1", 30, "pct"),
+                client.send_set("ZoneGain_1", 40, "pct"),
+            ))
+            assert await client.get("ZoneGain_0", "pct") == 20
+            assert await client.get("ZoneGain_1", "pct") == 40
+            assert client.stats.superseded == 1
+        finally:
+            await client.disconnect()
+            await simulator.stop()
+
+    asyncio.run(run())
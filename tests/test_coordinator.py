@@ -0,0 +1,201 @@
+"""Tests running AZMCoordinator against the simulated device."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from azm_simulator import AZMSimulator  # noqa: E402
+from custom_components.atlasied_azm import AZMCoordinator, azm_client  # noqa: E402
+from custom_components.atlasied_azm.scenes import SceneManager  # noqa: E402
+
+TIMEOUT = 5.0
+
+
+async def _wait_for(condition) -> None:
+    """Wait until condition() is true."""
+    async with asyncio.timeout(TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def _fast_link(monkeypatch, udp_port):
+    """Use a private UDP port and reconnect without the usual backoff."""
+    monkeypatch.setattr(azm_client, "UDP_PORT", udp_port)
+    monkeypatch.setattr(azm_client, "RECONNECT_MIN_DELAY", 0.05)
+
+
+@pytest.fixture
+async def simulator(udp_port):
+    """Run a small simulated device."""
+    simulator = AZMSimulator(
+        port=0, zones=2, sources=1, groups=1, meter_rate=0, udp_port=udp_port
+    )
+    await simulator.start()
+    yield simulator
+    await simulator.stop()
+
+
+@pytest.fixture
+def options() -> dict:
+    """Return extra coordinator arguments; override to change them."""
+    return {}
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant, simulator: AZMSimulator, options: dict):
+    """Return a coordinator connected to the simulator."""
+    coordinator = AZMCoordinator(
+        hass, simulator.host, num_zones=2, num_sources=1, num_groups=1,
+        heartbeat_interval=0, **options,
+    )
+    coordinator.client.port = simulator.port
+    assert await coordinator.async_connect()
+    yield coordinator
+    await coordinator.async_disconnect()
+
+
+async def _register(coordinator: AZMCoordinator, params: list[tuple[str, str]]) -> None:
+    """Register parameters as entities would and wait for their values."""
+    for param, fmt in params:
+        coordinator.register_parameter(param, fmt)
+    await coordinator.async_flush_registrations()
+    await _wait_for(lambda: all(coordinator.get_value(param) is not None for param, _ in params))
+
+
+async def test_registrations_are_refcounted_and_batched(coordinator, simulator):
+    """Only the first and last reference reach the device, in batches."""
+    stats = coordinator.client.stats
+    await _register(coordinator, [("ZoneMute_0", "val"), ("ZoneGain_0", "pct")])
+    assert stats.messages_out["sub"] == 1
+    assert coordinator.get_value("ZoneGain_0") == 75
+
+    # After setup, registrations made together share the next batch
+    coordinator.register_parameter("ZoneMute_0")
+    coordinator.register_parameter("ZoneMute_1")
+    coordinator.register_parameter("SourceMute_0")
+    await _wait_for(lambda: coordinator.get_value("SourceMute_0") is not None)
+    assert stats.messages_out["sub"] == 2
+
+    coordinator.unregister_parameter("ZoneMute_0")
+    await asyncio.sleep(0.05)
+    assert coordinator.is_registered("ZoneMute_0")
+    assert "unsub" not in stats.messages_out
+
+    coordinator.unregister_parameter("ZoneMute_0")
+    coordinator.unregister_parameter("ZoneMute_1")
+    await _wait_for(lambda: stats.messages_out["unsub"] == 1)
+    assert not coordinator.is_registered("ZoneMute_0")
+    (session,) = simulator._sessions
+    assert set(session.subscriptions) == {"ZoneGain_0", "SourceMute_0"}
+
+
+@pytest.mark.parametrize("options", [{"send_rate": 5, "send_burst": 1}])
+async def test_sets_are_coalesced_per_parameter(hass, coordinator):
+    """Sets made while one is in flight collapse into the latest value."""
+    stats = coordinator.client.stats
+    # Spend the burst so the first set waits for the token bucket
+    assert await coordinator.get_parameter("KeepAlive", "str")
+    first = hass.async_create_task(coordinator.set_parameter("ZoneGain_0", 10, "pct"))
+    await asyncio.sleep(0.05)
+    results = await asyncio.gather(
+        first,
+        coordinator.set_parameter("ZoneGain_0", 20, "pct"),
+        coordinator.set_parameter("ZoneGain_0", 30, "pct"),
+    )
+    assert results == [True, True, True]
+    assert stats.messages_out["set"] == 2
+    assert await coordinator.async_read_parameter("ZoneGain_0", "pct") == 30
+
+
+async def test_only_changes_reach_listeners(hass, coordinator):
+    """Unchanged echoes are dropped and each listener runs once per flush."""
+    calls = []
+
+    def failing():
+        raise RuntimeError("listener failed")
+
+    def both():
+        calls.append("both")
+
+    await _register(coordinator, [("ZoneMute_0", "val"), ("ZoneGain_0", "pct")])
+    coordinator.subscribe_parameter("ZoneMute_0", failing)
+    coordinator.subscribe_parameter("ZoneMute_0", both)
+    coordinator.subscribe_parameter("ZoneGain_0", both)
+    coordinator.subscribe_parameter("ZoneGain_0", lambda: calls.append("gain"))
+
+    unchanged = coordinator.stats.unchanged_updates
+    assert await coordinator.async_set_parameters(
+        [("ZoneMute_0", 1, "val"), ("ZoneGain_0", 50, "pct")]
+    )
+    # The device echoes both values, which were already stored
+    await _wait_for(lambda: coordinator.stats.unchanged_updates == unchanged + 2)
+    await hass.async_block_till_done()
+    assert sorted(calls) == ["both", "gain"]
+    assert coordinator.get_family("ZoneMute") == [1, None]
+
+
+@pytest.mark.parametrize("options", [{"meter_max_rate": 2.0}])
+async def test_meters_are_rate_limited(coordinator, simulator):
+    """A meter streaming fast is published at most meter_max_rate times a second."""
+    published = []
+    simulator.meter_rate = 50
+    coordinator.subscribe_parameter("ZoneMeter_0", lambda: published.append(1))
+    coordinator.register_parameter("ZoneMeter_0")
+    await coordinator.async_flush_registrations()
+
+    await _wait_for(lambda: coordinator.stats.meter_samples >= 20)
+    reading = coordinator.get_meter_reading("ZoneMeter_0")
+    assert reading is not None
+    assert reading.peak >= reading.last
+    assert len(published) <= coordinator.stats.meter_samples / 4
+
+
+async def test_scene_recall_sends_only_differences(hass, coordinator, simulator):
+    """Recalling a scene sets what changed and rolls back when it cannot."""
+    params = [("ZoneGain_0", "pct"), ("ZoneGain_1", "pct"), ("ZoneMute_0", "val")]
+    await _register(coordinator, params)
+    scenes = SceneManager(hass, coordinator, "test")
+    assert await scenes.async_save_scene("evening") == 3
+
+    assert await coordinator.set_parameter("ZoneGain_0", 40, "pct")
+    await _wait_for(lambda: coordinator.get_value("ZoneGain_0") == 40)
+    sets = coordinator.client.stats.messages_out["set"]
+    assert await scenes.async_recall_scene("evening")
+    assert coordinator.client.stats.messages_out["set"] == sets + 1
+    assert await coordinator.async_read_parameter("ZoneGain_0", "pct") == 75
+
+    assert await coordinator.set_parameter("ZoneGain_0", 40, "pct")
+    await _wait_for(lambda: coordinator.get_value("ZoneGain_0") == 40)
+    simulator.reset_connections = 1000
+    simulator.drop_connections()
+    await _wait_for(lambda: not coordinator.connected)
+    assert not await scenes.async_recall_scene("evening")
+    assert coordinator.get_value("ZoneGain_0") == 40
+
+
+@pytest.mark.parametrize("options", [{"fade_step_rate": 20.0}])
+async def test_fades_step_in_batches_until_preempted(coordinator, simulator):
+    """Fades reach their target in batched steps and stop on a manual set."""
+    stats = coordinator.client.stats
+    await _register(coordinator, [("ZoneGain_0", "pct"), ("ZoneGain_1", "pct")])
+
+    assert coordinator.fades.start(["ZoneGain_0", "ZoneGain_1"], 25, 0.3) == 2
+    await _wait_for(lambda: not coordinator.fades.active)
+    assert await coordinator.async_read_parameter("ZoneGain_0", "pct") == 25
+    assert await coordinator.async_read_parameter("ZoneGain_1", "pct") == 25
+    # Every step set both gains in one message
+    assert 1 < stats.messages_out["set"] <= 0.3 * 20 + 2
+
+    coordinator.fades.start(["ZoneGain_0", "ZoneGain_1"], 100, 10)
+    await _wait_for(lambda: coordinator.get_value("ZoneGain_1") > 25)
+    assert await coordinator.set_parameter("ZoneGain_0", 60, "pct")
+    assert coordinator.fades.active == ["ZoneGain_1"]
+    await asyncio.sleep(0.1)
+    assert await coordinator.async_read_parameter("ZoneGain_0", "pct") == 60
+    coordinator.fades.cancel()
@@ -0,0 +1,43 @@
+"""Tests for the TCP line framer."""
+from __future__ import annotations
+
+from atlasied_azm.azm_client import LineFramer
+
+
+def test_frames_split_across_reads():
+    """Frames are returned once their newline arrives, whatever the reads."""
+    framer = LineFramer()
+    assert framer.feed(b'{"a":') == []
+    assert framer.feed(b'1}\n{"b":2}\n{"c"') == ['{"a":1}', '{"b":2}']
+    assert framer.feed(b":3}\n") == ['{"c":3}']
+
+
+def test_crlf_and_blank_lines():
+    """Carriage returns are stripped and empty lines are skipped."""
+    framer = LineFramer()
+    assert framer.feed(b'{"a":1}\r\n\r\n\n{"b":2}\n') == ['{"a":1}', '{"b":2}']
+
+
+def test_utf8_character_split_across_reads():
+    """A multi-byte character split between two reads is decoded intact."""
+    framer = LineFramer()
+    data = '{"str":"Café"}\n'.encode("utf-8")
+    split = data.index(b"\xc3") + 1
+    assert framer.feed(data[:split]) == []
+    assert framer.feed(data[split:]) == ['{"str":"Café"}']
+
+
+def test_oversized_frame_is_dropped():
+    """A frame over the limit is dropped and the next one still comes through."""
+    framer = LineFramer(max_frame_size=16)
+    assert framer.feed(b"x" * 32 + b'\n{"a":1}\n') == ['{"a":1}']
+    assert framer.oversized_frames == 1
+
+
+def test_oversized_frame_across_reads_is_dropped():
+    """An unterminated frame over the limit is discarded up to its newline."""
+    framer = LineFramer(max_frame_size=16)
+    assert framer.feed(b"x" * 20) == []
+    assert framer.feed(b"x" * 20) == []
+    assert framer.feed(b'xx\n{"a":1}\n') == ['{"a":1}']
+    assert framer.oversized_frames == 1
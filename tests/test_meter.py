@@ -0,0 +1,111 @@
+"""Tests for the meter aggregator."""
+from __future__ import annotations
+
+from atlasied_azm.meter import MeterAggregator, MeterReading
+
+
+class _Timer:
+    """A callback scheduled on _ManualLoop."""
+
+    def __init__(self, when: float, callback, args: tuple):
+        """Initialize the timer."""
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the callback from running."""
+        self.cancelled = True
+
+
+class _ManualLoop:
+    """Just enough of an event loop to drive the aggregator by hand."""
+
+    def __init__(self):
+        """Initialize the loop at time 0."""
+        self.now = 0.0
+        self.timers: list[_Timer] = []
+
+    def time(self) -> float:
+        """Return the current loop time."""
+        return self.now
+
+    def call_later(self, delay: float, callback, *args) -> _Timer:
+        """Schedule callback after delay seconds."""
+        timer = _Timer(self.now + delay, callback, args)
+        self.timers.append(timer)
+        return timer
+
+    def advance_to(self, when: float) -> None:
+        """Move time forward, running every timer that falls due."""
+        self.now = when
+        due = [timer for timer in self.timers if timer.when <= when]
+        self.timers = [timer for timer in self.timers if timer.when > when]
+        for timer in sorted(due, key=lambda timer: timer.when):
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+
+def _aggregator(window: float = 2.0, max_rate: float = 1.0):
+    """Return a manual loop, an aggregator on it and its published readings."""
+    loop = _ManualLoop()
+    published: list[tuple[str, MeterReading]] = []
+    aggregator = MeterAggregator(
+        loop, lambda param, reading: published.append((param, reading)), window, max_rate
+    )
+    return loop, aggregator, published
+
+
+def test_samples_inside_the_rate_limit_are_folded():
+    """The first sample goes out at once, later ones in one trailing publish."""
+    loop, aggregator, published = _aggregator()
+    aggregator.add_sample("ZoneMeter_0", -10.0)
+    assert published == [("ZoneMeter_0", MeterReading(-10.0, -10.0, -10.0))]
+
+    loop.advance_to(0.2)
+    aggregator.add_sample("ZoneMeter_0", -30.0)
+    loop.advance_to(0.5)
+    aggregator.add_sample("ZoneMeter_0", -20.0)
+    assert len(published) == 1
+
+    loop.advance_to(1.0)
+    assert published[1] == ("ZoneMeter_0", MeterReading(-20.0, -10.0, -20.0))
+
+
+def test_window_drops_old_samples():
+    """Peak and average only cover the window, but keep the latest sample."""
+    loop, aggregator, published = _aggregator()
+    aggregator.add_sample("ZoneMeter_0", -5.0)
+    loop.advance_to(3.5)
+    aggregator.add_sample("ZoneMeter_0", -40.0)
+    assert published[-1] == ("ZoneMeter_0", MeterReading(-40.0, -40.0, -40.0))
+
+
+def test_channels_are_rate_limited_independently():
+    """A busy channel does not hold back another one."""
+    loop, aggregator, published = _aggregator()
+    aggregator.add_sample("ZoneMeter_0", -10.0)
+    loop.advance_to(0.1)
+    aggregator.add_sample("ZoneMeter_0", -11.0)
+    aggregator.add_sample("SourceMeter_0", -20.0)
+    assert [param for param, _ in published] == ["ZoneMeter_0", "SourceMeter_0"]
+
+
+def test_remove_and_close_cancel_pending_publishes():
+    """Removed channels and a closed aggregator publish nothing more."""
+    loop, aggregator, published = _aggregator()
+    for param in ("ZoneMeter_0", "ZoneMeter_1"):
+        aggregator.add_sample(param, -10.0)
+    loop.advance_to(0.1)
+    for param in ("ZoneMeter_0", "ZoneMeter_1"):
+        aggregator.add_sample(param, -12.0)
+
+    aggregator.remove("ZoneMeter_0")
+    loop.advance_to(1.0)
+    assert [param for param, _ in published] == ["ZoneMeter_0", "ZoneMeter_1", "ZoneMeter_1"]
+
+    aggregator.add_sample("ZoneMeter_1", -14.0)
+    aggregator.close()
+    loop.advance_to(5.0)
+    assert len(published) == 3
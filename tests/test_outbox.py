@@ -0,0 +1,82 @@
+"""Tests for the client's outbound batching and rate limiting."""
+from __future__ import annotations
+
+import asyncio
+
+from atlasied_azm import azm_client
+from atlasied_azm.azm_client import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_KEEPALIVE,
+    WRITE_BATCH_BYTES,
+    AZMClient,
+    _Outgoing,
+    _TokenBucket,
+)
+
+
+def test_token_bucket():
+    """The bucket starts full, refills at rate and never exceeds burst."""
+    bucket = _TokenBucket(10, 5, now=0.0)
+    assert bucket.available(0.0) == 5
+    bucket.consume(5)
+    assert bucket.available(0.0) == 0
+    assert bucket.delay() == 0.1
+    assert bucket.available(0.25) == 2
+    assert bucket.delay() == 0.0
+    assert bucket.available(100.0) == 5
+
+
+def _next_batch(outboxes: dict[int, list[int]], limit: int | None = None) -> list[str]:
+    """Queue messages of the given sizes by priority and take one batch.
+
+    Returns the names of the batched messages: "i", "k" or "b" for
+    interactive, keepalive and bulk, followed by their position.
+    """
+
+    async def run() -> list[str]:
+        loop = asyncio.get_running_loop()
+        client = AZMClient("127.0.0.1")
+        names = {}
+        for priority, sizes in outboxes.items():
+            for position, size in enumerate(sizes):
+                item = _Outgoing(b"x" * size, loop.create_future(), loop.time(), None)
+                names[id(item)] = "ikb"[priority] + str(position)
+                client._outboxes[priority].append(item)
+        return [names[id(item)] for item in client._next_batch(limit)]
+
+    return asyncio.run(run())
+
+
+def test_batch_takes_interactive_messages_first():
+    """Interactive messages go before keepalives, and both before bulk."""
+    batch = _next_batch({
+        PRIORITY_BULK: [10, 10],
+        PRIORITY_KEEPALIVE: [10],
+        PRIORITY_INTERACTIVE: [10, 10],
+    })
+    assert batch == ["i0", "i1", "k0", "b0", "b1"]
+
+
+def test_bulk_messages_fill_the_byte_budget():
+    """Bulk messages stop once a batch reaches WRITE_BATCH_BYTES."""
+    size = WRITE_BATCH_BYTES // 4 + 1
+    assert _next_batch({PRIORITY_BULK: [size] * 8}) == ["b0", "b1", "b2", "b3"]
+
+
+def test_bulk_messages_keep_a_share_under_interactive_load():
+    """Heavy interactive traffic still leaves BULK_MIN_SHARE for bulk."""
+    share = int(WRITE_BATCH_BYTES * azm_client.BULK_MIN_SHARE)
+    batch = _next_batch({
+        PRIORITY_INTERACTIVE: [WRITE_BATCH_BYTES * 2],
+        PRIORITY_BULK: [share, share],
+    })
+    assert batch == ["i0", "b0"]
+
+
+def test_limit_keeps_a_share_for_bulk_messages():
+    """With a limit, interactive messages leave BULK_MIN_SHARE of it to bulk."""
+    batch = _next_batch({PRIORITY_INTERACTIVE: [10] * 10, PRIORITY_BULK: [10] * 10}, limit=8)
+    assert batch == ["i0", "i1", "i2", "i3", "i4", "i5", "b0", "b1"]
+    batch = _next_batch({PRIORITY_INTERACTIVE: [10] * 10}, limit=8)
+    assert len(batch) == 8
@@ -0,0 +1,61 @@
+"""Tests for the parameter store."""
+from __future__ import annotations
+
+from atlasied_azm.params import METER_FAMILIES, ParameterStore, ParamKey, parse_param
+
+
+def test_parse_param():
+    """Names are split into an interned family and index."""
+    assert parse_param("ZoneGain_3") == ParamKey("ZoneGain", 3)
+    assert parse_param("ZoneGain_3") is parse_param("ZoneGain_3")
+    assert parse_param("KeepAlive") is None
+    assert parse_param("Zone_x") is None
+
+
+def test_set_reports_changes():
+    """set returns True only when the stored value changes."""
+    store = ParameterStore(2, 1, 1)
+    assert store.get("ZoneGain_0") is None
+    assert store.set("ZoneGain_0", 75)
+    assert not store.set("ZoneGain_0", 75)
+    assert not store.set("ZoneGain_0", "75")
+    assert store.set("ZoneGain_0", 75.5)
+    assert store.get("ZoneGain_0") == 75.5
+    assert store.set("ZoneMute_1", 1)
+    assert store.get("ZoneMute_1") == 1
+    assert isinstance(store.get("ZoneMute_1"), int)
+
+
+def test_none_marks_a_value_unreported():
+    """Setting None forgets a value, and only counts as a change once."""
+    store = ParameterStore(2, 1, 1)
+    assert not store.set("SourceMute_0", None)
+    store.set("SourceMute_0", 1)
+    assert store.set("SourceMute_0", None)
+    assert not store.set("SourceMute_0", None)
+    assert store.get("SourceMute_0") is None
+
+
+def test_text_and_other_parameters():
+    """Names, unindexed and out of range parameters are stored too."""
+    store = ParameterStore(2, 1, 1)
+    assert store.set("ZoneName_1", "Lobby")
+    assert not store.set("ZoneName_1", "Lobby")
+    assert store.get("ZoneName_1") == "Lobby"
+    assert store.set("KeepAlive", "OK")
+    assert store.get("KeepAlive") == "OK"
+    assert store.set("ZoneGain_5", 10)
+    assert store.get("ZoneGain_5") == 10
+
+
+def test_dump_and_snapshot():
+    """dump lists known channel values; snapshot a whole family."""
+    store = ParameterStore(2, 1, 1)
+    store.set("ZoneGain_1", 40)
+    store.set("ZoneMeter_0", -12.5)
+    store.set("SourceName_0", "Mic")
+    assert store.dump(skip=METER_FAMILIES) == {"ZoneGain_1": 40, "SourceName_0": "Mic"}
+    assert store.dump()["ZoneMeter_0"] == -12.5
+    assert store.snapshot("ZoneGain") == [None, 40]
+    assert store.snapshot("ZoneName") == [None, None]
+    assert store.snapshot("NoSuchFamily") == []
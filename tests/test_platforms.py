@@ -0,0 +1,164 @@
+"""Tests setting up the integration's platforms against simulated devices."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.config_entries import ConfigEntryState  # noqa: E402
+from homeassistant.const import CONF_HOST, STATE_UNAVAILABLE  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from azm_simulator import AZMSimulator  # noqa: E402
+import custom_components.atlasied_azm as integration  # noqa: E402
+from custom_components.atlasied_azm import azm_client  # noqa: E402
+from custom_components.atlasied_azm.const import (  # noqa: E402
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_NUM_GROUPS,
+    CONF_NUM_SOURCES,
+    CONF_NUM_ZONES,
+    DOMAIN,
+)
+
+TIMEOUT = 5.0
+
+# One simulated box per address, so meters are routed per device
+HOSTS = ["127.0.0.1", "127.0.0.2"]
+
+
+async def _wait_for(condition) -> None:
+    """Wait until condition() is true."""
+    async with asyncio.timeout(TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def _custom_integration(enable_custom_integrations):
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture(autouse=True)
+def _fast_link(monkeypatch, udp_port):
+    """Use a private UDP port and reconnect without the usual backoff."""
+    monkeypatch.setattr(azm_client, "UDP_PORT", udp_port)
+    monkeypatch.setattr(azm_client, "RECONNECT_MIN_DELAY", 0.05)
+
+
+@pytest.fixture
+async def simulators(monkeypatch, udp_port):
+    """Run one simulated device per loopback host and point clients at them."""
+    simulators = [
+        AZMSimulator(host, port=0, zones=2, sources=1, groups=1, meter_rate=20, udp_port=udp_port)
+        for host in HOSTS
+    ]
+    for simulator in simulators:
+        await simulator.start()
+    ports = {simulator.host: simulator.port for simulator in simulators}
+
+    def client(host: str, *args, **kwargs) -> azm_client.AZMClient:
+        """Return a client for the simulator listening on host."""
+        return azm_client.AZMClient(host, *args, port=ports[host], **kwargs)
+
+    monkeypatch.setattr(integration, "AZMClient", client)
+    yield simulators
+    for simulator in simulators:
+        await simulator.stop()
+
+
+@pytest.fixture
+async def entries(hass: HomeAssistant, simulators: list[AZMSimulator]):
+    """Set up a config entry for every simulated device."""
+    entries = []
+    for simulator in simulators:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=simulator.host,
+            data={
+                CONF_HOST: simulator.host,
+                CONF_NUM_ZONES: 2,
+                CONF_NUM_SOURCES: 1,
+                CONF_NUM_GROUPS: 1,
+            },
+            options={CONF_HEARTBEAT_INTERVAL: 0},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+    yield entries
+    for entry in entries:
+        if entry.state is ConfigEntryState.LOADED:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _entity_id(hass: HomeAssistant, platform: str, host: str, param: str) -> str:
+    """Return the entity id of a device parameter's entity."""
+    entity_id = er.async_get(hass).async_get_entity_id(platform, DOMAIN, f"{host}_{param}")
+    assert entity_id is not None
+    return entity_id
+
+
+def _state(hass: HomeAssistant, entity_id: str) -> str | None:
+    """Return an entity's state, or None before it has one."""
+    state = hass.states.get(entity_id)
+    return state.state if state is not None else None
+
+
+async def test_entities_follow_their_own_device(hass, simulators, entries):
+    """Every box gets its own entities, reading and controlling only that box."""
+    first, second = HOSTS
+    gains = {host: _entity_id(hass, "number", host, "ZoneGain_0") for host in HOSTS}
+    await _wait_for(lambda: all(_state(hass, gain) == "75" for gain in gains.values()))
+
+    name = _entity_id(hass, "sensor", first, "ZoneName_1")
+    assert _state(hass, name) == "Zone 2"
+    assert hass.states.get(gains[first]).name == "Zone 1"
+
+    await hass.services.async_call(
+        "number", "set_value", {"entity_id": gains[second], "value": 40}, blocking=True
+    )
+    await _wait_for(lambda: _state(hass, gains[second]) == "40")
+    assert simulators[1].values["ZoneGain_0"] == -48.0
+    assert simulators[0].values["ZoneGain_0"] == -20.0
+    assert _state(hass, gains[first]) == "75"
+
+    mute = _entity_id(hass, "switch", first, "ZoneMute_0")
+    assert _state(hass, mute) == "off"
+    await hass.services.async_call("switch", "turn_on", {"entity_id": mute}, blocking=True)
+    await _wait_for(lambda: _state(hass, mute) == "on")
+    assert simulators[0].values["ZoneMute_0"] == 1
+    assert simulators[1].values["ZoneMute_0"] == 0
+
+    meter = _entity_id(hass, "sensor", second, "SourceMeter_0")
+    await _wait_for(lambda: "peak" in hass.states.get(meter).attributes)
+    assert -60.0 <= float(_state(hass, meter)) <= 0.0
+
+
+async def test_entities_are_unavailable_while_reconnecting(hass, simulators, entries):
+    """Losing one box only makes its own entities unavailable."""
+    first, second = HOSTS
+    groups = {host: _entity_id(hass, "switch", host, "GroupActive_0") for host in HOSTS}
+    await _wait_for(lambda: all(_state(hass, group) == "off" for group in groups.values()))
+
+    simulators[0].reset_connections = 1000
+    simulators[0].drop_connections()
+    await _wait_for(lambda: _state(hass, groups[first]) == STATE_UNAVAILABLE)
+    assert _state(hass, groups[second]) == "off"
+
+    simulators[0].reset_connections = 0
+    await _wait_for(lambda: _state(hass, groups[first]) == "off")
+
+
+async def test_unload_disconnects(hass, simulators, entries):
+    """Unloading an entry closes its connection and leaves the other running."""
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    assert entries[0].state is ConfigEntryState.NOT_LOADED
+    await _wait_for(lambda: not simulators[0]._sessions)
+    assert len(simulators[1]._sessions) == 1
+    assert hass.data[DOMAIN].keys() == {entries[1].entry_id}
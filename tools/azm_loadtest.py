@@ -0,0 +1,149 @@
+"""Load test the integration against simulated AZM devices.
+
+Starts several simulators, connects one coordinator (or, without Home
+Assistant installed, one bare AZMClient) to each, subscribes every
+parameter including meters, and reports how many meter updates per second
+were delivered and how much CPU the process needed to keep up.
+
+Usage: python tools/azm_loadtest.py [--devices N] [--meter-rate HZ] [--duration S]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import azm_package  # noqa: E402
+from azm_simulator import AZMSimulator, device_hosts  # noqa: E402
+
+try:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.atlasied_azm import AZMCoordinator, azm_client
+except ImportError:
+    HomeAssistant = None
+    azm_package.install()
+    from atlasied_azm import azm_client  # noqa: E402
+
+
+def device_params(zones: int, sources: int, groups: int) -> list[tuple[str, str]]:
+    """Return every parameter the platforms subscribe to."""
+    params = []
+    for kind, count in (("Zone", zones), ("Source", sources)):
+        for i in range(count):
+            params += [
+                (f"{kind}Name_{i}", "str"),
+                (f"{kind}Gain_{i}", "pct"),
+                (f"{kind}Mute_{i}", "val"),
+                (f"{kind}Meter_{i}", "val"),
+            ]
+    params += [(f"GroupActive_{i}", "val") for i in range(groups)]
+    return params
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the load test and print a summary."""
+    azm_client.UDP_PORT = args.udp_port
+    hosts = device_hosts(args.host, args.devices)
+    simulators = [
+        AZMSimulator(
+            host,
+            args.port,
+            zones=args.zones,
+            sources=args.sources,
+            groups=args.groups,
+            meter_rate=args.meter_rate,
+            udp_port=args.udp_port,
+        )
+        for host in hosts
+    ]
+    for simulator in simulators:
+        await simulator.start()
+
+    received = 0
+
+    def count_meter(meter_callback):
+        def wrapper(param_data):
+            nonlocal received
+            received += 1
+            if meter_callback:
+                meter_callback(param_data)
+        return wrapper
+
+    params = device_params(args.zones, args.sources, args.groups)
+    hass = HomeAssistant(tempfile.mkdtemp()) if HomeAssistant else None
+    links = []
+    for host in hosts:
+        if hass:
+            coordinator = AZMCoordinator(
+                hass, host, args.zones, args.sources, args.groups
+            )
+            coordinator.client.port = args.port
+            client = coordinator.client
+            client.meter_callback = count_meter(client.meter_callback)
+            if not await coordinator.async_connect():
+                raise SystemExit(f"Could not connect to simulator at {host}")
+            for param, fmt in params:
+                coordinator.register_parameter(param, fmt)
+            await coordinator.async_flush_registrations()
+            links.append(coordinator)
+        else:
+            client = azm_client.AZMClient(host, None, count_meter(None), port=args.port)
+            if not await client.connect():
+                raise SystemExit(f"Could not connect to simulator at {host}")
+            await client.subscribe_multiple(params)
+            links.append(client)
+
+    await asyncio.sleep(1)
+    received = 0
+    sent_before = sum(sim.datagrams_out for sim in simulators)
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+
+    await asyncio.sleep(args.duration)
+
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    datagrams = sum(sim.datagrams_out for sim in simulators) - sent_before
+    meters_per_datagram = args.zones + args.sources
+
+    print(f"mode:               {'coordinator' if hass else 'client only'}")
+    print(f"devices:            {args.devices}")
+    print(f"meter datagrams/s:  {datagrams / wall:10.1f} sent")
+    print(f"meter updates/s:    {datagrams * meters_per_datagram / wall:10.1f} sent")
+    print(f"meter updates/s:    {received / wall:10.1f} processed")
+    print(f"cpu utilisation:    {cpu / wall:10.1%} (includes the simulators)")
+
+    for link in links:
+        if hass:
+            await link.async_disconnect()
+        else:
+            await link.disconnect()
+    for simulator in simulators:
+        await simulator.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.10", help="address of the first device")
+    parser.add_argument("--port", type=int, default=azm_client.TCP_PORT)
+    parser.add_argument("--udp-port", type=int, default=azm_client.UDP_PORT)
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--zones", type=int, default=16)
+    parser.add_argument("--sources", type=int, default=16)
+    parser.add_argument("--groups", type=int, default=8)
+    parser.add_argument("--meter-rate", type=float, default=20.0, help="meter datagrams/s per device")
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
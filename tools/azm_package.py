@@ -0,0 +1,24 @@
+"""Import the integration's Home Assistant independent modules.
+
+The client, capture, framer, meter, parameter store and stats modules have
+no Home Assistant dependency. install() exposes them as the "atlasied_azm"
+package without running the integration's __init__, which needs Home
+Assistant, so tools, tests and benchmarks can use them on their own.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+INTEGRATION = os.path.join(ROOT, "custom_components", "atlasied_azm")
+
+
+def install() -> None:
+    """Register the "atlasied_azm" package unless it is already imported."""
+    if "atlasied_azm" in sys.modules:
+        return
+    package = types.ModuleType("atlasied_azm")
+    package.__path__ = [INTEGRATION]
+    sys.modules["atlasied_azm"] = package
@@ -0,0 +1,149 @@
+"""Replay a traffic capture through the integration.
+
+Feeds the inbound TCP reads and UDP datagrams of a capture recorded with
+the start_capture service back through AZMClient's message handlers and,
+when Home Assistant is installed, the coordinator, at the original pace or
+faster. Outbound records are counted but not replayed. Turns a production
+load profile or bug report into a repeatable run.
+
+Usage: python tools/azm_replay.py CAPTURE [--speed X] [--zones N] [--sources N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import azm_package  # noqa: E402
+
+try:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.atlasied_azm import AZMCoordinator, azm_client, capture
+except ImportError:
+    HomeAssistant = None
+    azm_package.install()
+    from atlasied_azm import azm_client, capture  # noqa: E402
+
+
+async def replay(
+    path: str,
+    speed: float = 0.0,
+    zones: int = 16,
+    sources: int = 16,
+    groups: int = 8,
+) -> dict[str, Any]:
+    """Replay a capture and return what it took.
+
+    speed scales the recorded timing (2.0 plays twice as fast); 0 replays
+    as fast as possible while still yielding to the event loop after every
+    record, as the socket readers would.
+    """
+    hass = HomeAssistant(tempfile.mkdtemp()) if HomeAssistant else None
+    if hass:
+        coordinator = AZMCoordinator(hass, "replay", zones, sources, groups)
+        client = coordinator.client
+    else:
+        coordinator = None
+        client = azm_client.AZMClient("replay", lambda _: None, lambda _: None)
+
+    records = list(capture.read_capture(path))
+    framer = azm_client.LineFramer()
+    counts = {capture.TCP_IN: 0, capture.UDP_IN: 0, capture.TCP_OUT: 0}
+    messages = 0
+
+    loop = asyncio.get_running_loop()
+    cpu_before = time.process_time()
+    wall_before = loop.time()
+    for timestamp, kind, payload in records:
+        counts[kind] += 1
+        if speed > 0:
+            delay = wall_before + timestamp / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if kind == capture.TCP_IN:
+            for line in framer.feed(payload):
+                client._handle_tcp_message(line)
+                messages += 1
+        elif kind == capture.UDP_IN:
+            client._handle_udp_message(payload.decode("utf-8"))
+            messages += 1
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    wall = loop.time() - wall_before
+    cpu = time.process_time() - cpu_before
+
+    summary = {
+        "mode": "coordinator" if hass else "client only",
+        "recorded_seconds": records[-1][0] if records else 0.0,
+        "tcp_reads": counts[capture.TCP_IN],
+        "udp_datagrams": counts[capture.UDP_IN],
+        "tcp_writes": counts[capture.TCP_OUT],
+        "messages": messages,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "link": client.stats.as_dict(),
+    }
+    if coordinator:
+        summary["coordinator"] = coordinator.stats.as_dict()
+        await coordinator.async_disconnect()
+        await hass.async_stop(force=True)
+    return summary
+
+
+def run(path: str, repeat: int = 3) -> list[dict[str, Any]]:
+    """Replay a capture as fast as possible and return benchmark results."""
+    best = None
+    for _ in range(repeat):
+        summary = asyncio.run(replay(path))
+        if best is None or summary["wall_seconds"] < best["wall_seconds"]:
+            best = summary
+    rate = best["messages"] / best["wall_seconds"] if best["wall_seconds"] else 0.0
+    return [{
+        "name": f"replay.{os.path.basename(path)}",
+        "value": rate,
+        "unit": "msg/s",
+        "messages": best["messages"],
+    }]
+
+
+def main() -> None:
+    """Parse arguments and replay the capture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="capture file written by start_capture")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="playback speed; 0 replays as fast as possible (default 1)")
+    parser.add_argument("--zones", type=int, default=16)
+    parser.add_argument("--sources", type=int, default=16)
+    parser.add_argument("--groups", type=int, default=8)
+    args = parser.parse_args()
+
+    summary = asyncio.run(
+        replay(args.capture, args.speed, args.zones, args.sources, args.groups)
+    )
+    wall = summary["wall_seconds"]
+    print(f"mode:               {summary['mode']}")
+    print(f"recorded:           {summary['recorded_seconds']:10.1f} s")
+    print(f"replayed in:        {wall:10.1f} s")
+    print(f"tcp reads:          {summary['tcp_reads']:10d}")
+    print(f"udp datagrams:      {summary['udp_datagrams']:10d}")
+    print(f"tcp writes:         {summary['tcp_writes']:10d} (not replayed)")
+    print(f"messages/s:         {summary['messages'] / wall if wall else 0.0:10.1f}")
+    print(f"cpu utilisation:    {summary['cpu_seconds'] / wall if wall else 0.0:10.1%}")
+    print(f"meter drops:        {summary['link']['meter_drops']:10d}")
+    if "coordinator" in summary:
+        stats = summary["coordinator"]
+        print(f"updates:            {stats['updates']:10d} ({stats['unchanged_updates']} unchanged)")
+        print(f"meter samples:      {stats['meter_samples']:10d}")
+
+
+if __name__ == "__main__":
+    main()
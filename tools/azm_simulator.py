@@ -0,0 +1,337 @@
+"""Simulated AtlasIED AZM4/AZM8 device for tests and load generation.
+
+Speaks the same newline-delimited JSON-RPC 2.0 as the real device on its
+TCP control port (get, set, bmp, sub, unsub) and pushes subscribed meters
+over UDP. Latency, dropped connections and the meter flood rate can be
+injected so the integration can be exercised without hardware.
+
+Usage: python tools/azm_simulator.py [--devices N] [--zones N] [--meter-rate HZ]
+
+With --devices N the simulators listen on consecutive loopback addresses
+starting at --host (127.0.0.1, 127.0.0.2, ...) so each one looks like a
+separate box to the integration's per-address UDP routing.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import random
+from typing import Any, Optional
+
+TCP_PORT = 5321
+UDP_PORT = 3131
+
+_LOGGER = logging.getLogger("azm_simulator")
+
+GAIN_MIN_DB = -80.0
+GAIN_MAX_DB = 0.0
+
+
+class _Session:
+    """One TCP control connection to the simulator."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Initialize the session."""
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")[0]
+        self.task = asyncio.current_task()
+        self.subscriptions: dict[str, str] = {}
+
+
+class AZMSimulator:
+    """An in-process fake AZM device."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = TCP_PORT,
+        zones: int = 8,
+        sources: int = 4,
+        groups: int = 4,
+        latency: float = 0.0,
+        meter_rate: float = 10.0,
+        udp_port: int = UDP_PORT,
+    ):
+        """Initialize the simulator.
+
+        latency delays every response and push by that many seconds.
+        meter_rate is the number of meter datagrams per second sent to each
+        connection with meter subscriptions; 0 disables meters.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.meter_rate = meter_rate
+        self.udp_port = udp_port
+        self.values: dict[str, Any] = {"KeepAlive": "OK"}
+        for i in range(zones):
+            self.values[f"ZoneName_{i}"] = f"Zone {i + 1}"
+            self.values[f"ZoneGain_{i}"] = -20.0
+            self.values[f"ZoneMute_{i}"] = 0
+            self.values[f"ZoneMeter_{i}"] = -60.0
+        for i in range(sources):
+            self.values[f"SourceName_{i}"] = f"Source {i + 1}"
+            self.values[f"SourceGain_{i}"] = -20.0
+            self.values[f"SourceMute_{i}"] = 0
+            self.values[f"SourceMeter_{i}"] = -60.0
+        for i in range(groups):
+            self.values[f"GroupActive_{i}"] = 0
+
+        self.messages_in = 0
+        self.messages_out = 0
+        self.datagrams_out = 0
+        # Connections still to be reset right after they are accepted
+        self.reset_connections = 0
+        self._sessions: set[_Session] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._udp: Optional[asyncio.DatagramTransport] = None
+        self._meter_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening for control connections."""
+        loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        # Pick up the real port when asked to listen on an ephemeral one
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._udp, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, local_addr=(self.host, 0)
+        )
+        self._meter_task = asyncio.create_task(self._meter_loop())
+        _LOGGER.info("Simulated AZM listening on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop the simulator and close every connection."""
+        if self._meter_task:
+            self._meter_task.cancel()
+        tasks = [session.task for session in self._sessions]
+        self.drop_connections()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._udp:
+            self._udp.close()
+
+    def drop_connections(self) -> None:
+        """Close every control connection, as a device reboot would."""
+        for session in list(self._sessions):
+            session.writer.close()
+        self._sessions.clear()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one control connection."""
+        if self.reset_connections > 0:
+            # As a booting device does: accept, then drop the connection
+            self.reset_connections -= 1
+            writer.close()
+            return
+        session = _Session(reader, writer)
+        self._sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    self._handle(session, line)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._sessions.discard(session)
+            writer.close()
+
+    def _handle(self, session: _Session, line: bytes) -> None:
+        """Handle one JSON-RPC message from a client."""
+        self.messages_in += 1
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            self._send(session, _error(None, -32700, "Parse error"))
+            return
+
+        method = message.get("method")
+        request_id = message.get("id")
+        params = message.get("params", [])
+        batched = isinstance(params, list)
+        if not batched:
+            params = [params]
+
+        if method == "get":
+            found = [p for p in params if p.get("param") in self.values]
+            if not found:
+                self._send(session, _error(request_id, -32602, "Invalid param"))
+                return
+            answers = [self._format(p["param"], p.get("fmt", "val")) for p in found]
+            response = {
+                "jsonrpc": "2.0",
+                "method": "getResp",
+                "params": answers if batched else answers[0],
+            }
+            if request_id is not None:
+                response["id"] = request_id
+            self._send(session, response)
+
+        elif method in ("set", "bmp"):
+            for p in params:
+                self._apply(p, relative=method == "bmp")
+
+        elif method == "sub":
+            for p in params:
+                if p.get("param") in self.values:
+                    session.subscriptions[p["param"]] = p.get("fmt", "val")
+
+        elif method == "unsub":
+            for p in params:
+                session.subscriptions.pop(p.get("param"), None)
+
+        else:
+            self._send(session, _error(request_id, -32601, "Method not found"))
+
+    def _apply(self, param_data: dict[str, Any], relative: bool) -> None:
+        """Apply a set or bump and push the new value to subscribers."""
+        param = param_data.get("param")
+        if param not in self.values:
+            return
+
+        for fmt in ("val", "pct", "str"):
+            if fmt in param_data:
+                value = param_data[fmt]
+                break
+        else:
+            return
+
+        if fmt == "pct" and "Gain" in param:
+            value = float(value) * (GAIN_MAX_DB - GAIN_MIN_DB) / 100
+            if not relative:
+                value += GAIN_MIN_DB
+        if relative:
+            value = self.values[param] + value
+        if "Gain" in param:
+            value = max(GAIN_MIN_DB, min(GAIN_MAX_DB, value))
+        self.values[param] = value
+
+        for session in list(self._sessions):
+            fmt = session.subscriptions.get(param)
+            if fmt is not None:
+                self._send(session, {
+                    "jsonrpc": "2.0",
+                    "method": "update",
+                    "params": self._format(param, fmt),
+                })
+
+    def _format(self, param: str, fmt: str) -> dict[str, Any]:
+        """Render a parameter value in the requested format."""
+        value = self.values[param]
+        if fmt == "pct" and "Gain" in param:
+            value = round((value - GAIN_MIN_DB) * 100 / (GAIN_MAX_DB - GAIN_MIN_DB))
+        elif fmt == "str":
+            value = str(value)
+        return {"param": param, fmt: value}
+
+    def _send(self, session: _Session, message: dict[str, Any]) -> None:
+        """Write a message to a client, after the injected latency."""
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        self.messages_out += 1
+        if self.latency > 0:
+            asyncio.get_running_loop().call_later(self.latency, _write, session, data)
+        else:
+            _write(session, data)
+
+    async def _meter_loop(self) -> None:
+        """Push subscribed meters to every client over UDP."""
+        while True:
+            if self.meter_rate <= 0:
+                await asyncio.sleep(1)
+                continue
+            await asyncio.sleep(1 / self.meter_rate)
+            for session in list(self._sessions):
+                meters = [
+                    {"param": param, "val": round(random.uniform(-60.0, 0.0), 1)}
+                    for param in session.subscriptions
+                    if "Meter" in param
+                ]
+                if meters:
+                    data = json.dumps({"jsonrpc": "2.0", "method": "update", "params": meters})
+                    self._udp.sendto(data.encode("utf-8"), (session.peer, self.udp_port))
+                    self.datagrams_out += 1
+
+
+def _write(session: _Session, data: bytes) -> None:
+    """Write to a session unless it has gone away."""
+    if not session.writer.is_closing():
+        session.writer.write(data)
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    """Build a JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "error": {"code": code, "message": message}, "id": request_id}
+
+
+def device_hosts(first: str, count: int) -> list[str]:
+    """Return count consecutive addresses starting at first."""
+    start = ipaddress.ip_address(first)
+    return [str(start + i) for i in range(count)]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run simulators until interrupted."""
+    simulators = [
+        AZMSimulator(
+            host,
+            args.port,
+            zones=args.zones,
+            sources=args.sources,
+            groups=args.groups,
+            latency=args.latency,
+            meter_rate=args.meter_rate,
+            udp_port=args.udp_port,
+        )
+        for host in device_hosts(args.host, args.devices)
+    ]
+    for simulator in simulators:
+        await simulator.start()
+
+    try:
+        while True:
+            if args.drop_every:
+                await asyncio.sleep(args.drop_every)
+                victim = random.choice(simulators)
+                _LOGGER.info("Dropping connections on %s", victim.host)
+                victim.drop_connections()
+            else:
+                await asyncio.sleep(3600)
+    finally:
+        for simulator in simulators:
+            await simulator.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the simulators."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address of the first device")
+    parser.add_argument("--port", type=int, default=TCP_PORT)
+    parser.add_argument("--udp-port", type=int, default=UDP_PORT, help="client meter port")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--sources", type=int, default=4)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay in seconds")
+    parser.add_argument("--meter-rate", type=float, default=10.0, help="meter datagrams/s per client")
+    parser.add_argument("--drop-every", type=float, default=0.0,
+                        help="drop a random device's connections every N seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()